@@ -2,10 +2,25 @@
 Web interface for the paper recommender.
 """
 
-from flask import Flask, render_template_string, request, jsonify
+import gzip
+import hashlib
+import json
+import signal
+import sys
+import uuid
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from flask import Flask, Response, abort, request, jsonify
 from recommender import PaperRecommender
 
 app = Flask(__name__)
+# API payloads are large lists of paper dicts; skip key sorting and
+# pretty-printing, and emit UTF-8 directly instead of \u escapes.
+app.json.sort_keys = False
+app.json.compact = True
+app.json.ensure_ascii = False
 rec = PaperRecommender()
 
 # Load data on startup
@@ -13,6 +28,10 @@ rec.load_papers()
 rec.load_embeddings()
 rec.load_ratings()
 rec.load_readlist()
+# Save ratings/readlist off the request path
+rec.start_writer()
+# Exit through sys.exit on SIGTERM so atexit still flushes pending saves
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
 # Validate embeddings match papers
 if rec.embeddings is not None and len(rec.papers) != rec.embeddings.shape[0]:
@@ -172,6 +191,10 @@ HTML_TEMPLATE = """
             max-height: 100px;
             overflow-y: auto;
         }
+        .abstract-toggle {
+            font-size: 13px;
+            margin-bottom: 10px;
+        }
         .rating-buttons {
             display: flex;
             gap: 5px;
@@ -363,20 +386,49 @@ HTML_TEMPLATE = """
         <div id="readlistPapers"></div>
     </div>
 
+    <template id="paperTmpl">
+        <div class="paper">
+            <div class="paper-title"><span class="rec-score"></span><span class="t-title"></span></div>
+            <div class="paper-authors"></div>
+            <div class="paper-meta">
+                <span class="t-meta"></span><a class="t-doi" target="_blank">DOI</a>
+                <br><small style="color:#999" class="t-key"></small>
+            </div>
+            <div class="paper-abstract"><strong>Abstract:</strong> <span class="t-abstract"></span></div>
+            <div class="abstract-toggle"><a href="#">Show abstract</a></div>
+            <div class="rating-buttons">
+                Rate:
+                <button data-rating="-1" class="irrelevant">Irrelevant</button>
+                <button data-rating="1">1</button>
+                <button data-rating="2">2</button>
+                <button data-rating="3">3</button>
+                <button data-rating="4">4</button>
+                <button data-rating="5">5</button>
+                <span class="score"></span>
+                <button class="readlist-btn"></button>
+                <span class="rank-control"><span class="rank-label"></span><button class="rank-up" title="Move up">+</button><button class="rank-down" title="Move down">&minus;</button></span>
+            </div>
+        </div>
+    </template>
+
     <script>
+        const paperTmpl = document.getElementById('paperTmpl');
         let ratings = {};
         let readlist = new Map();
         let totalPapers = 0;
         let cachedSearchPapers = [];
-        function escapeHtml(str) {
-            if (str == null) return '';
-            return String(str)
-                .replace(/&/g, '&amp;')
-                .replace(/</g, '&lt;')
-                .replace(/>/g, '&gt;')
-                .replace(/"/g, '&quot;')
-                .replace(/'/g, '&#039;');
-        }
+        let stateVersion = null;  // "<boot id>-<state version>" token of the last /api/stats sync
+        // Rating clicks are coalesced per paper and sent in one batch once
+        // the user pauses, so rapid corrections (3, 4, 5) cost one request.
+        const pendingRatings = new Map();  // dblp_key -> score (0 clears)
+        let ratingFlushTimer = null;
+        const RATING_FLUSH_DELAY = 300;
+        // List endpoints omit abstracts; they are fetched when expanded
+        const abstractCache = new Map();  // dblp_key -> abstract text
+        // Rank +/- clicks only send the final rank once the user stops clicking
+        const pendingRanks = new Map();  // dblp_key -> rank
+        let rankFlushTimer = null;
+        const RANK_FLUSH_DELAY = 250;
 
         function showTab(name) {
             document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
@@ -390,80 +442,162 @@ HTML_TEMPLATE = """
         }
 
         function updateStats() {
-            fetch('/api/stats')
+            const url = stateVersion === null ? '/api/stats' : `/api/stats?since=${encodeURIComponent(stateVersion)}`;
+            fetch(url)
                 .then(r => r.json())
                 .then(data => {
                     totalPapers = data.total_papers;
-                    // Merge server ratings into local state rather than
-                    // replacing wholesale.  If the user clicked a rating
-                    // between when the fetch was sent and when it resolved,
-                    // a wholesale replacement would silently discard that
-                    // click and cause the next renderPaper() call (e.g. on
-                    // tab switch) to show stale state.
-                    Object.assign(ratings, data.ratings);
-                    Object.entries(data.readlist).forEach(([k, p]) => readlist.set(k, p));
+                    stateVersion = data.version;
+                    if (!data.unchanged) {
+                        // Merge server ratings into local state rather than
+                        // replacing wholesale.  If the user clicked a rating
+                        // between when the fetch was sent and when it resolved,
+                        // a wholesale replacement would silently discard that
+                        // click and cause the next renderPaper() call (e.g. on
+                        // tab switch) to show stale state.  A null value means
+                        // the key was removed on the server.
+                        Object.entries(data.ratings).forEach(([k, v]) => {
+                            if (v === null) delete ratings[k]; else ratings[k] = v;
+                        });
+                        Object.entries(data.readlist).forEach(([k, p]) => {
+                            if (p === null) readlist.delete(k); else readlist.set(k, p);
+                        });
+                    }
                     updateStatsLocal();
                 });
         }
 
         function renderPaper(paper, score = null, showPriority = false) {
+            // Clone the <template id="paperTmpl"> skeleton and fill it in with
+            // textContent, so no HTML is parsed or escaped per paper.
             const key = paper.dblp_key;
-            const escapedKey = escapeHtml(key);
             const currentRating = ratings[key] || 0;
-            const safeKey = key.replace(/[^a-zA-Z0-9]/g, '_');
-            const ratingButtons = [-1, 1, 2, 3, 4, 5].map(r => {
-                const selected = currentRating === r ? 'selected' : '';
-                const irrelevant = r === -1 ? 'irrelevant' : '';
-                const label = r === -1 ? 'Irrelevant' : r;
-                return `<button data-rating="${r}" class="${selected} ${irrelevant}" onclick="rate('${escapedKey}', ${r})">${label}</button>`;
-            }).join('');
-
-            const scoreHtml = score !== null ? `<span class="rec-score">${score.toFixed(3)}</span>` : '';
-            const doiLink = paper.doi ? `<a href="https://doi.org/${escapeHtml(paper.doi)}" target="_blank">DOI</a>` : '';
-            const authors = (paper.authors || []).slice(0, 3).map(a => escapeHtml(a)).join(', ') + (paper.authors && paper.authors.length > 3 ? ' et al.' : '');
-            const ratedIrrelevant = currentRating === -1 ? 'rated-irrelevant' : '';
+            const node = paperTmpl.content.firstElementChild.cloneNode(true);
+            const part = sel => node.querySelector(sel);
+
+            node.dataset.key = key;
+            node.classList.toggle('rated-irrelevant', currentRating === -1);
+
+            if (score !== null) {
+                part('.rec-score').textContent = score.toFixed(3);
+            } else {
+                part('.rec-score').remove();
+            }
+            part('.t-title').textContent = paper.title || 'Untitled';
+            const authors = paper.authors || [];
+            part('.paper-authors').textContent = authors.slice(0, 3).join(', ') + (authors.length > 3 ? ' et al.' : '');
+            part('.t-meta').textContent = `${paper.year ?? ''} | ${paper.venue || 'TOG'} | `;
+            if (paper.doi) {
+                part('.t-doi').href = 'https://doi.org/' + paper.doi;
+            } else {
+                part('.t-doi').remove();
+            }
+            part('.t-key').textContent = key;
+
+            if (paper.abstract) {
+                part('.t-abstract').textContent = paper.abstract;
+                part('.abstract-toggle').remove();
+            } else {
+                part('.paper-abstract').remove();
+                if (!paper.has_abstract) part('.abstract-toggle').remove();
+            }
+
+            const buttons = part('.rating-buttons');
+            buttons.dataset.key = key;
+            buttons.querySelectorAll('button[data-rating]').forEach(btn => {
+                btn.classList.toggle('selected', parseInt(btn.dataset.rating) === currentRating);
+            });
+            const scoreSpan = part('.score');
+            scoreSpan.textContent = currentRating ? `Current: ${currentRating}` : '';
+            if (currentRating) scoreSpan.after(makeClearButton());
 
             const inReadlist = readlist.has(key);
-            const readlistBtnClass = inReadlist ? 'readlist-btn in-readlist' : 'readlist-btn';
-            const readlistBtnText = inReadlist ? '✓ In Read List' : '+ Read Later';
-            const clearBtn = currentRating ? `<button class="clear-btn" onclick="clearRating('${escapedKey}')" title="Clear rating">×</button>` : '';
+            const rlBtn = part('.readlist-btn');
+            rlBtn.classList.toggle('in-readlist', inReadlist);
+            rlBtn.textContent = inReadlist ? '✓ In Read List' : '+ Read Later';
+
+            const rankCtrl = part('.rank-control');
+            if (showPriority && inReadlist) {
+                rankCtrl.dataset.rankKey = key;
+                part('.rank-label').textContent = '#' + readlist.get(key);
+            } else {
+                rankCtrl.remove();
+            }
+
+            return node;
+        }
 
-            const abstractHtml = paper.abstract
-                ? `<div class="paper-abstract"><strong>Abstract:</strong> ${escapeHtml(paper.abstract)}</div>`
-                : '';
+        function makeClearButton() {
+            const btn = document.createElement('button');
+            btn.className = 'clear-btn';
+            btn.textContent = '×';
+            btn.title = 'Clear rating';
+            return btn;
+        }
+
+        // One delegated click handler per panel dispatches every card button,
+        // so rendering a card does not attach any listeners.
+        function onCardClick(e) {
+            const el = e.target.closest('button, .abstract-toggle a');
+            const card = el && el.closest('[data-key]');
+            if (!card) return;
+            const key = card.dataset.key;
+            if (el.dataset.rating) rate(key, parseInt(el.dataset.rating));
+            else if (el.classList.contains('clear-btn')) clearRating(key);
+            else if (el.classList.contains('readlist-btn')) toggleReadlist(key);
+            else if (el.classList.contains('rank-up')) moveReadlist(key, 'up');
+            else if (el.classList.contains('rank-down')) moveReadlist(key, 'down');
+            else if (el.tagName === 'A') {
+                e.preventDefault();
+                showAbstract(el, key);
+            }
+        }
+        document.querySelectorAll('.panel').forEach(panel => panel.addEventListener('click', onCardClick));
+
+        function showPapers(container, cards) {
+            // Build the whole list off-document, then swap it in at once
+            const frag = document.createDocumentFragment();
+            cards.forEach(card => frag.appendChild(card));
+            container.replaceChildren(frag);
+        }
 
-            let rankHtml = '';
-            if (showPriority && readlist.has(key)) {
-                rankHtml = `<span class="rank-control" data-rank-key="${escapedKey}"><span class="rank-label">#${readlist.get(key)}</span><button onclick="moveReadlist('${escapedKey}', 'up')" title="Move up">+</button><button onclick="moveReadlist('${escapedKey}', 'down')" title="Move down">&minus;</button></span>`;
+        function showAbstract(link, key) {
+            const container = link.parentElement;
+            const render = text => {
+                const label = document.createElement('strong');
+                label.textContent = 'Abstract:';
+                container.className = 'paper-abstract';
+                container.replaceChildren(label, ' ' + text);
+            };
+            if (abstractCache.has(key)) {
+                render(abstractCache.get(key));
+                return;
             }
+            link.textContent = 'Loading abstract...';
+            fetch(`/api/abstract?key=${encodeURIComponent(key)}`)
+                .then(r => r.json())
+                .then(data => {
+                    abstractCache.set(key, data.abstract || '');
+                    render(data.abstract || '');
+                });
+        }
+
+        // Search as the user types, once they pause; Enter still searches at once
+        let searchTimer = null;
+        let lastQuery = null;
+        const SEARCH_DELAY = 250;
+        const MIN_LIVE_QUERY = 3;
 
-            return `
-                <div class="paper ${ratedIrrelevant}" id="paper-${safeKey}" data-key="${escapedKey}">
-                    <div class="paper-title">${scoreHtml}${escapeHtml(paper.title) || 'Untitled'}</div>
-                    <div class="paper-authors">${authors}</div>
-                    <div class="paper-meta">
-                        ${escapeHtml(paper.year)} | ${escapeHtml(paper.venue) || 'TOG'} | ${doiLink}
-                        <br><small style="color:#999">${escapedKey}</small>
-                    </div>
-                    ${abstractHtml}
-                    <div class="rating-buttons" data-key="${escapedKey}">
-                        Rate: ${ratingButtons}
-                        <span class="score">${currentRating ? `Current: ${currentRating}` : ''}</span>
-                        ${clearBtn}
-                        <button class="${readlistBtnClass}" onclick="toggleReadlist('${escapedKey}')">${readlistBtnText}</button>
-                        ${rankHtml}
-                    </div>
-                </div>
-            `;
-        }
-
-        function search() {
+        function search(live = false) {
+            clearTimeout(searchTimer);
             const query = document.getElementById('searchQuery').value;
-            if (!query) return;
+            if (!query || (live && query === lastQuery)) return;
+            lastQuery = query;
 
             fetch(`/api/search?q=${encodeURIComponent(query)}`)
                 .then(r => r.json())
                 .then(data => {
+                    if (query !== lastQuery) return;  // a newer search was sent meanwhile
                     cachedSearchPapers = data.papers;
                     document.getElementById('searchSortControl').style.display = cachedSearchPapers.length > 0 ? 'flex' : 'none';
                     document.getElementById('searchSort').value = 'relevance';
@@ -471,6 +605,13 @@ HTML_TEMPLATE = """
                 });
         }
 
+        document.getElementById('searchQuery').addEventListener('input', e => {
+            clearTimeout(searchTimer);
+            if (e.target.value.trim().length >= MIN_LIVE_QUERY) {
+                searchTimer = setTimeout(() => search(true), SEARCH_DELAY);
+            }
+        });
+
         function renderSearchResults() {
             const sort = document.getElementById('searchSort').value;
             const papers = [...cachedSearchPapers];
@@ -484,7 +625,7 @@ HTML_TEMPLATE = """
             if (papers.length === 0) {
                 document.getElementById('searchResults').innerHTML = '<div class="no-results">No papers found</div>';
             } else {
-                document.getElementById('searchResults').innerHTML = papers.map(p => renderPaper(p)).join('');
+                showPapers(document.getElementById('searchResults'), papers.map(p => renderPaper(p)));
             }
         }
 
@@ -496,7 +637,7 @@ HTML_TEMPLATE = """
             const currentRating = ratings[key] || 0;
             const inReadlist = readlist.has(key);
 
-            document.querySelectorAll('[data-key="' + escapeHtml(key) + '"]').forEach(paperEl => {
+            document.querySelectorAll('[data-key="' + CSS.escape(key) + '"]').forEach(paperEl => {
                 // --- rating buttons ---
                 paperEl.querySelectorAll('button[data-rating]').forEach(btn => {
                     btn.classList.toggle('selected', parseInt(btn.dataset.rating) === currentRating);
@@ -511,12 +652,7 @@ HTML_TEMPLATE = """
                 // --- clear button: add if rated, remove if not ---
                 let clearBtn = paperEl.querySelector('.clear-btn');
                 if (currentRating && !clearBtn) {
-                    clearBtn = document.createElement('button');
-                    clearBtn.className = 'clear-btn';
-                    clearBtn.textContent = '\u00d7';
-                    clearBtn.title = 'Clear rating';
-                    clearBtn.setAttribute('onclick', "clearRating('" + escapeHtml(key) + "')");
-                    scoreSpan.insertAdjacentElement('afterend', clearBtn);
+                    scoreSpan.after(makeClearButton());
                 } else if (!currentRating && clearBtn) {
                     clearBtn.remove();
                 }
@@ -539,30 +675,40 @@ HTML_TEMPLATE = """
             });
         }
 
-        function rate(key, score) {
-            ratings[key] = score;
-            updatePaperCard(key);
-            updateStatsLocal();
+        function queueRating(key, score) {
+            pendingRatings.set(key, score);
+            clearTimeout(ratingFlushTimer);
+            ratingFlushTimer = setTimeout(flushRatings, RATING_FLUSH_DELAY);
+        }
 
-            // Send to server (fire and forget)
-            fetch('/api/rate', {
+        function flushRatings() {
+            // Returns a promise so views that depend on ratings can wait
+            // for pending clicks to reach the server before fetching.
+            clearTimeout(ratingFlushTimer);
+            if (pendingRatings.size === 0) return Promise.resolve();
+            const updates = [...pendingRatings].map(([key, score]) => ({key, score}));
+            pendingRatings.clear();
+            return fetch('/api/rate/batch', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({key: key, score: score})
+                body: JSON.stringify({updates: updates}),
+                keepalive: true
             });
         }
 
+        function rate(key, score) {
+            ratings[key] = score;
+            updatePaperCard(key);
+            updateStatsLocal();
+            queueRating(key, score);
+        }
+
         function clearRating(key) {
             delete ratings[key];
             updatePaperCard(key);
             updateStatsLocal();
-
-            // Send to server (score=0 removes the rating)
-            fetch('/api/rate', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({key: key, score: 0})
-            });
+            // score=0 removes the rating on the server
+            queueRating(key, 0);
         }
 
         function updateStatsLocal() {
@@ -579,43 +725,72 @@ HTML_TEMPLATE = """
 
         function getRecommendations() {
             document.getElementById('recResults').innerHTML = '<div class="no-results">Loading recommendations...</div>';
-            fetch('/api/recommendations?n=30')
+            flushRatings()
+                .then(() => fetch('/api/recommendations?n=30'))
                 .then(r => r.json())
                 .then(data => {
                     if (data.recommendations.length === 0) {
                         document.getElementById('recResults').innerHTML = '<div class="no-results">Rate some papers first to get recommendations!</div>';
                     } else {
-                        document.getElementById('recResults').innerHTML = data.recommendations.map(r => renderPaper(r.paper, r.score)).join('');
+                        showPapers(document.getElementById('recResults'), data.recommendations.map(r => renderPaper(r.paper, r.score)));
                     }
                 });
         }
 
-        function loadRated() {
-            const sort = document.getElementById('ratedSort').value;
-            fetch(`/api/rated?sort=${sort}`)
+        const PAGE_SIZE = 50;
+
+        function loadPaged(container, url, toCard, emptyHtml, onPage = () => {}) {
+            // Fetch a long list PAGE_SIZE papers at a time; the next page is
+            // requested once a sentinel after the last card scrolls into view.
+            const pager = {};
+            container.pager = pager;
+            let offset = 0;
+            const fetchPage = () => fetch(`${url}&offset=${offset}&limit=${PAGE_SIZE}`)
                 .then(r => r.json())
                 .then(data => {
-                    if (data.papers.length === 0) {
-                        document.getElementById('ratedPapers').innerHTML = '<div class="no-results">No papers rated yet</div>';
-                    } else {
-                        document.getElementById('ratedPapers').innerHTML = data.papers.map(p => renderPaper(p)).join('');
+                    if (container.pager !== pager) return;  // list was reloaded meanwhile
+                    onPage(data.papers);
+                    if (offset === 0 && data.papers.length === 0) {
+                        container.innerHTML = emptyHtml;
+                        return;
                     }
+                    const cards = data.papers.map(toCard);
+                    if (offset === 0) showPapers(container, cards); else container.append(...cards);
+                    offset += data.papers.length;
+                    if (data.papers.length < PAGE_SIZE) return;
+                    const sentinel = document.createElement('div');
+                    container.append(sentinel);
+                    const observer = new IntersectionObserver(entries => {
+                        if (!entries[0].isIntersecting) return;
+                        observer.disconnect();
+                        sentinel.remove();
+                        fetchPage();
+                    });
+                    observer.observe(sentinel);
                 });
+            return fetchPage();
+        }
+
+        function loadRated() {
+            const sort = document.getElementById('ratedSort').value;
+            flushRatings().then(() => loadPaged(
+                document.getElementById('ratedPapers'),
+                `/api/rated?sort=${sort}`,
+                p => renderPaper(p),
+                '<div class="no-results">No papers rated yet</div>'
+            ));
         }
 
         function loadReadlist() {
             const sort = document.getElementById('readlistSort').value;
-            fetch(`/api/readlist?sort=${sort}`)
-                .then(r => r.json())
-                .then(data => {
-                    // Update local rank map with raw rank values
-                    data.papers.forEach(p => readlist.set(p.paper.dblp_key, p.rank));
-                    if (data.papers.length === 0) {
-                        document.getElementById('readlistPapers').innerHTML = '<div class="no-results">No papers in read list yet. Click "+ Read Later" on any paper to add it.</div>';
-                    } else {
-                        document.getElementById('readlistPapers').innerHTML = data.papers.map((p, i) => renderPaper(p.paper, p.score, true)).join('');
-                    }
-                });
+            Promise.all([flushRatings(), flushRanks()]).then(() => loadPaged(
+                document.getElementById('readlistPapers'),
+                `/api/readlist?sort=${sort}`,
+                p => renderPaper(p.paper, p.score, true),
+                '<div class="no-results">No papers in read list yet. Click "+ Read Later" on any paper to add it.</div>',
+                // Update local rank map with raw rank values
+                papers => papers.forEach(p => readlist.set(p.paper.dblp_key, p.rank))
+            ));
         }
 
         function toggleReadlist(key) {
@@ -649,15 +824,24 @@ HTML_TEMPLATE = """
             readlist.set(key, newRank);
 
             // Update only this card's rank label
-            document.querySelectorAll('[data-rank-key="' + escapeHtml(key) + '"] .rank-label')
+            document.querySelectorAll('[data-rank-key="' + CSS.escape(key) + '"] .rank-label')
                 .forEach(el => el.textContent = '#' + newRank);
 
-            // Send to server (fire and forget)
-            fetch('/api/readlist/move', {
+            pendingRanks.set(key, newRank);
+            clearTimeout(rankFlushTimer);
+            rankFlushTimer = setTimeout(flushRanks, RANK_FLUSH_DELAY);
+        }
+
+        function flushRanks() {
+            clearTimeout(rankFlushTimer);
+            const requests = [...pendingRanks].map(([key, rank]) => fetch('/api/readlist/set_rank', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({key: key, direction: direction})
-            });
+                body: JSON.stringify({key: key, rank: rank}),
+                keepalive: true
+            }));
+            pendingRanks.clear();
+            return Promise.all(requests);
         }
 
         // Theme toggle
@@ -682,6 +866,18 @@ HTML_TEMPLATE = """
             updateThemeButton();
         }
 
+        // Don't lose ratings clicked just before closing the tab
+        window.addEventListener('pagehide', () => {
+            flushRatings();
+            flushRanks();
+        });
+
+        // Re-sync when the tab comes back into view, picking up ratings made
+        // meanwhile in another tab or the CLI; only the changes are sent
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'visible') updateStats();
+        });
+
         // Initial load
         loadTheme();
         updateStats();
@@ -690,104 +886,316 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# The page has no template variables, so encode it once instead of running
+# it through Jinja on every request.
+INDEX_BYTES = HTML_TEMPLATE.encode('utf-8')
+INDEX_GZIP = gzip.compress(INDEX_BYTES, 9)
+INDEX_ETAG = hashlib.md5(INDEX_BYTES).hexdigest()
+
+# Distinguishes this process's state versions from those of earlier runs,
+# which also started counting at 0
+BOOT_ID = uuid.uuid4().hex[:8]
+
+def state_etag(*parts):
+    """ETag for a response that depends only on rec.state_version and parts."""
+    return f'{BOOT_ID}-{rec.state_version}:' + ':'.join(str(p) for p in parts)
+
+def conditional(etag, make_response):
+    """Return 304 if the client already has etag, otherwise make_response()."""
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = make_response()
+    resp.set_etag(etag, weak=True)
+    # Always revalidate; the ETag changes whenever ratings or readlist do
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+def json_body():
+    """
+    Parse a POST body directly, skipping Flask's get_json content-type checks
+    and caching.  An empty, malformed or non-object body is a 400, as with
+    get_json.
+    """
+    try:
+        data = json.loads(request.get_data(cache=False))
+    except ValueError:
+        abort(400)
+    if not isinstance(data, dict):
+        abort(400)
+    return data
+
+def is_score(value):
+    """A rating score must be a real number; bool is an int but not a score."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# Cards show at most this many authors, plus "et al." when there are more
+CARD_AUTHORS = 3
+
+def slim_paper(paper):
+    """
+    Copy of a paper for list views: no abstract (loaded lazily via
+    /api/abstract) and only the authors a card displays.
+    """
+    slim = {k: v for k, v in paper.items() if k != 'abstract'}
+    slim['has_abstract'] = bool(paper.get('abstract'))
+    if len(slim.get('authors') or ()) > CARD_AUTHORS + 1:
+        # One extra author is enough for the card to know to add "et al."
+        slim['authors'] = slim['authors'][:CARD_AUTHORS + 1]
+    return slim
+
+def stream_papers(items):
+    """Stream a {"papers": [...]} response one item at a time."""
+    def generate():
+        yield '{"papers":['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + app.json.dumps(item)
+        yield ']}'
+    return Response(generate(), mimetype='application/json')
+
+# JSON bodies smaller than this are not worth the gzip header overhead
+GZIP_MIN_SIZE = 500
+
+@app.after_request
+def compress_json(resp):
+    """Gzip API responses (including streamed lists) for clients that accept it."""
+    if (resp.status_code != 200 or resp.mimetype != 'application/json'
+            or 'Content-Encoding' in resp.headers
+            or 'gzip' not in request.accept_encodings):
+        return resp
+    if resp.is_streamed:
+        resp.response = gzip_chunks(resp.response)
+    else:
+        data = resp.get_data()
+        if len(data) < GZIP_MIN_SIZE:
+            return resp
+        resp.set_data(gzip.compress(data, 6))
+    resp.headers['Content-Encoding'] = 'gzip'
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+def gzip_chunks(chunks):
+    """Gzip a streamed body chunk by chunk, keeping it streamed."""
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = z.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        if out:
+            yield out
+    yield z.flush()
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    # Each encoding gets its own validator, since caches key on Vary and must
+    # not revalidate one body with the other's ETag
+    if 'gzip' in request.accept_encodings:
+        body, etag = INDEX_GZIP, f'{INDEX_ETAG}-gz'
+    else:
+        body, etag = INDEX_BYTES, INDEX_ETAG
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'public, max-age=3600',
+        'Vary': 'Accept-Encoding',
+    }
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    if body is INDEX_GZIP:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(body, mimetype='text/html', headers=headers)
+
+def version_token(version):
+    """Client-facing state version; BOOT_ID keeps tokens from earlier runs from matching."""
+    return f'{BOOT_ID}-{version}'
+
+def stats_counts(version):
+    return {
+        'total_papers': len(rec.papers),
+        'total_ratings': len(rec.ratings),
+        'positive_ratings': rec.positive_count,
+        'negative_ratings': rec.negative_count,
+        'readlist_count': len(rec.readlist),
+        'version': version_token(version)
+    }
+
+@lru_cache(maxsize=1)
+def full_stats_json(version):
+    """Serialized full /api/stats body, reused until the state version changes."""
+    data = stats_counts(version)
+    # Copies (a single C-level step under the GIL): request threads may
+    # rate papers while dumps() walks the maps
+    data['ratings'] = dict(rec.ratings)
+    data['readlist'] = dict(rec.readlist)
+    return app.json.dumps(data)
 
 @app.route('/api/stats')
 def stats():
-    positive = sum(1 for v in rec.ratings.values() if v > 0)
-    negative = sum(1 for v in rec.ratings.values() if v < 0)
-    return jsonify({
-        'total_papers': len(rec.papers),
-        'total_ratings': len(rec.ratings),
-        'positive_ratings': positive,
-        'negative_ratings': negative,
-        'ratings': rec.ratings,
-        'readlist': rec.readlist,
-        'readlist_count': len(rec.readlist)
-    })
+    # With ?since=<version token>, only send the entries that changed after
+    # that version (removed keys map to null) instead of the full maps.
+    version = rec.state_version
+    boot, _, since = request.args.get('since', '').partition('-')
+    if boot != BOOT_ID or not since.isdigit() or int(since) > version:
+        # No version yet, or one from before a server restart.  A reload
+        # with nothing changed revalidates this against the ETag.
+        return conditional(
+            state_etag('stats'),
+            lambda: Response(full_stats_json(version), mimetype='application/json'),
+        )
+    since = int(since)
+    data = stats_counts(version)
+    if since == version:
+        data['unchanged'] = True
+    else:
+        data['ratings'], data['readlist'] = rec.changes_since(since)
+    return jsonify(data)
 
 @app.route('/api/search')
 def search():
     query = request.args.get('q', '')
     papers = rec.find_paper(query) if query else []
-    return jsonify({'papers': papers})
+    return jsonify({'papers': [slim_paper(p) for p in papers]})
+
+@app.route('/api/abstract')
+def abstract():
+    paper = rec.get_paper_by_key(request.args.get('key', ''))
+    resp = jsonify({'abstract': paper.get('abstract') if paper else None})
+    resp.headers['Cache-Control'] = 'public, max-age=3600'
+    return resp
 
 @app.route('/api/rate', methods=['POST'])
 def rate():
-    data = request.json
+    data = json_body()
     key = data.get('key')
     score = data.get('score')
     if key and score is not None:
+        if not isinstance(key, str) or not is_score(score):
+            abort(400)
         if score == 0:
             # Remove rating
-            rec.ratings.pop(key, None)
-            rec.save_ratings()
+            rec.clear_rating(key)
         else:
             rec.rate_paper(key, score)
     return jsonify({'success': True})
 
+@app.route('/api/rate/batch', methods=['POST'])
+def rate_batch():
+    items = json_body().get('updates', [])
+    if not isinstance(items, list) or not all(
+        isinstance(u, dict) and isinstance(u.get('key'), str) and is_score(u.get('score'))
+        for u in items
+    ):
+        abort(400)
+    updates = {u['key']: u['score'] for u in items if u['key']}
+    if updates:
+        rec.rate_papers(updates)
+    return jsonify({'success': True})
+
 @app.route('/api/recommendations')
 def recommendations():
     n = int(request.args.get('n', 20))
+    return conditional(
+        state_etag('recommendations', n),
+        lambda: Response(cached_recommendations(rec.state_version, n), mimetype='application/json'),
+    )
+
+@lru_cache(maxsize=8)
+def cached_recommendations(version, n):
+    """Serialized recommendations as of a state version (the version is only a cache key)."""
     recs = rec.get_recommendations(top_k=n)
-    return jsonify({
-        'recommendations': [{'paper': p, 'score': s} for p, s in recs]
-    })
+    return app.json.dumps({'recommendations': [
+        {'paper': slim_paper(p), 'score': float(s)} for p, s in recs
+    ]})
+
+# (state version, {(list name, sort): sorted items}).  Switching between sort
+# orders without rating anything reuses the already-sorted lists.  Replaced
+# by a single assignment rather than mutated, so request threads never see a
+# dict changing under them.
+_sorted_cache: tuple[int, dict[tuple[str, str], list]] = (-1, {})
+
+def cached_sorted(name, sort, build):
+    """Return build(sort), reusing the result while rec.state_version is unchanged."""
+    global _sorted_cache
+    version = rec.state_version
+    cached_version, lists = _sorted_cache
+    if cached_version == version and (name, sort) in lists:
+        return lists[(name, sort)]
+    items = build(sort)
+    # Entries from older versions are dropped; they can never be hit again
+    kept = lists if cached_version == version else {}
+    _sorted_cache = (version, {**kept, (name, sort): items})
+    return items
 
 @app.route('/api/rated')
 def rated():
     sort = request.args.get('sort', 'rating')
-    papers = []
-    for key in rec.ratings:
-        paper = rec.get_paper_by_key(key)
-        if paper:
-            papers.append(paper)
+    start, stop = page_bounds()
+    return conditional(
+        state_etag('rated', sort, start, stop),
+        lambda: stream_papers(cached_sorted('rated', sort, sorted_rated)[start:stop]),
+    )
+
+def page_bounds():
+    """(start, stop) slice for the ?offset=&limit= args; the whole list by default."""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = request.args.get('limit', type=int)
+    return offset, None if limit is None else offset + max(limit, 0)
+
+def sort_order(values, descending=False):
+    """Stable argsort of a numeric column, like list.sort(reverse=...)."""
+    values = np.asarray(values)
+    return np.argsort(-values if descending else values, kind='stable')
+
+def sorted_rated(sort):
+    # One snapshot for both passes: a request thread may clear a rating meanwhile
+    ratings = dict(rec.ratings)
+    keys = [k for k in ratings if rec.get_paper_by_key(k)]
 
     # Sort based on parameter
     if sort == 'year':
-        papers.sort(key=lambda p: p.get('year', 0), reverse=True)
+        order = sort_order(rec.get_years(keys), descending=True)
     elif sort == 'year-asc':
-        papers.sort(key=lambda p: p.get('year', 0))
+        order = sort_order(rec.get_years(keys))
     else:  # rating (default)
-        papers.sort(key=lambda p: rec.ratings.get(p['dblp_key'], 0), reverse=True)
+        order = sort_order([ratings[k] for k in keys], descending=True)
 
-    return jsonify({'papers': papers})
+    return [slim_paper(p) for p in rec.get_papers_by_keys([keys[i] for i in order])]
 
 @app.route('/api/readlist')
 def get_readlist():
     sort = request.args.get('sort', 'relevance')
-    papers = []
-    keys = list(rec.readlist)
+    start, stop = page_bounds()
+    return conditional(
+        state_etag('readlist', sort, start, stop),
+        lambda: stream_papers(cached_sorted('readlist', sort, sorted_readlist)[start:stop]),
+    )
+
+def sorted_readlist(sort):
+    readlist = dict(rec.readlist)
+    keys = list(readlist)
 
     # Get relevance scores
     scores = rec.get_relevance_scores(keys)
 
-    for key in keys:
-        paper = rec.get_paper_by_key(key)
-        if paper:
-            papers.append({
-                'paper': paper,
-                'score': scores.get(key, 0),
-                'rank': rec.readlist.get(key, 0)
-            })
+    papers = [
+        {'paper': slim_paper(paper), 'score': scores.get(key, 0), 'rank': readlist[key]}
+        for key, paper in zip(keys, rec.get_papers_by_keys(keys))
+        if paper
+    ]
+    keys = [p['paper']['dblp_key'] for p in papers]
 
     # Sort based on parameter
     if sort == 'year':
-        papers.sort(key=lambda p: p['paper'].get('year', 0), reverse=True)
+        order = sort_order(rec.get_years(keys), descending=True)
     elif sort == 'year-asc':
-        papers.sort(key=lambda p: p['paper'].get('year', 0))
+        order = sort_order(rec.get_years(keys))
     elif sort == 'relevance':
-        papers.sort(key=lambda p: p['score'], reverse=True)
+        order = sort_order([p['score'] for p in papers], descending=True)
     else:  # rank (default)
-        papers.sort(key=lambda p: p['rank'])
+        order = sort_order([p['rank'] for p in papers])
 
-    return jsonify({'papers': papers})
+    return [papers[i] for i in order]
 
 @app.route('/api/readlist/add', methods=['POST'])
 def add_to_readlist():
-    data = request.json
+    data = json_body()
     key = data.get('key')
     if key:
         rec.add_to_readlist(key)
@@ -795,7 +1203,7 @@ def add_to_readlist():
 
 @app.route('/api/readlist/move', methods=['POST'])
 def move_in_readlist():
-    data = request.json
+    data = json_body()
     key = data.get('key')
     direction = data.get('direction')
     if key and direction == 'up':
@@ -804,9 +1212,18 @@ def move_in_readlist():
         rec.move_readlist_down(key)
     return jsonify({'success': True})
 
+@app.route('/api/readlist/set_rank', methods=['POST'])
+def set_readlist_rank():
+    data = json_body()
+    key = data.get('key')
+    rank = data.get('rank')
+    if key and isinstance(rank, int):
+        rec.set_readlist_rank(key, rank)
+    return jsonify({'success': True})
+
 @app.route('/api/readlist/remove', methods=['POST'])
 def remove_from_readlist():
-    data = request.json
+    data = json_body()
     key = data.get('key')
     if key:
         rec.remove_from_readlist(key)
@@ -818,4 +1235,6 @@ if __name__ == '__main__':
     print("="*50)
     print("\nOpen your browser to: http://localhost:5000")
     print("Press Ctrl+C to stop\n")
-    app.run(debug=False, port=5000)
+    # Threaded so a slow /api/recommendations doesn't block rating clicks;
+    # the numpy matmuls release the GIL while they run.
+    app.run(debug=False, port=5000, threaded=True)
@@ -10,13 +10,19 @@ This script:
 5. Enriches with abstracts from Semantic Scholar
 6. Fills missing abstracts from OpenAlex
 
+API responses are cached in data/http_cache for a week, so reruns only hit
+the network for new or changed queries. Delete that directory to refetch.
+
 Output: data/papers.json
 """
 
+import hashlib
 import json
+import os
 import re
+import threading
 import time
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
@@ -26,35 +32,178 @@ DBLP_API = "https://dblp.org/search/publ/api"
 S2_BATCH_API = "https://api.semanticscholar.org/graph/v1/paper/batch"
 OPENALEX_API = "https://api.openalex.org/works"
 
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
+HTTP_CACHE_TTL = 7 * 24 * 3600  # seconds
+# Responses worth caching: found, and definitively not found
+CACHEABLE_STATUS = (200, 404)
+
+# Rate-limited (429) requests are retried this many times, waiting for the
+# server's Retry-After or else an exponential backoff starting here
+RATE_LIMIT_RETRIES = 6
+RATE_LIMIT_BACKOFF = 2.0  # seconds
+
+# Per-year DBLP queries start at most this often, with a few in flight at once
+DBLP_INTERVAL = 0.3
+DBLP_WORKERS = 4
+
+# TOG result pages (fetched DBLP_WORKERS at a time, like the per-year queries)
+DBLP_PAGE_INTERVAL = 0.3
+
+# OpenAlex allows 10 requests/s
+OPENALEX_INTERVAL = 0.1
+OPENALEX_WORKERS = 8
+# DOIs per OpenAlex filter query (the filter accepts up to 100 OR'd values)
+OPENALEX_BATCH = 50
+
+# Semantic Scholar allows about one unauthenticated request per second.
+# Batches start at that rate but may be in flight at the same time.
+S2_INTERVAL = 1.0
+S2_WORKERS = 4
+
+# Conference page numbers: article "21:1-21:9", range "53-59" or single "73"
+CONF_PAGES_RE = re.compile(r"^\d+(?::\d+-\d+:\d+|-\d+)?$")
+PAGE_RANGE_RE = re.compile(r"^\d+-\d+$")
+
+# Copyright boilerplate that precedes the real abstract in some sources
+BOILERPLATE_RES = [
+    re.compile(pattern, re.DOTALL | re.IGNORECASE)
+    for pattern in (
+        r"^.*?Permission to make digital or hard copies.*?(?:Abstract|ABSTRACT)\s*",
+        r"^.*?©\s*\d{4}\s*ACM.*?(?:Abstract|ABSTRACT)\s*",
+        r"^.*?Request permissions from.*?(?:Abstract|ABSTRACT)\s*",
+    )
+] + [re.compile(r"^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s*#.*?(?:Abstract|ABSTRACT)\s*", re.DOTALL)]
+
+# Phrases near the start of an "abstract" that show it is scraped page metadata
+PAGE_METADATA_RE = re.compile(
+    "|".join(re.escape(phrase) for phrase in (
+        "article ",  # page navigation
+        "Authors Info",
+        "View Profile",
+        "Share on",
+        "ACM Transactions on Graphics",
+        "ACM SIGGRAPH",
+        "Info & Claims",
+        "Citations",
+        "Downloads",
+        "Publication History",
+    )),
+    re.IGNORECASE,
+)
+
+_thread_local = threading.local()
+
+
+def http_session() -> requests.Session:
+    """requests.Session for the current thread, reused so connections stay open."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+
+class RateLimiter:
+    """Spaces out wait() calls at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+def retry_delay(resp: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a 429: Retry-After if given, else backoff."""
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):  # absent, or an HTTP date
+        return RATE_LIMIT_BACKOFF * 2 ** attempt
+
+
+def fetch_json(method: str, url: str, limiter: RateLimiter, **kwargs) -> tuple[int, object]:
+    """
+    Send a request and return (status code, parsed JSON or None). 200 and 404
+    responses are cached on disk for HTTP_CACHE_TTL; only actual network
+    requests wait on the limiter. 429 responses are retried (see retry_delay).
+    """
+    request_id = json.dumps([method, url, kwargs.get("params"), kwargs.get("json")], sort_keys=True)
+    path = HTTP_CACHE_DIR / (hashlib.sha1(request_id.encode()).hexdigest() + ".json")
+    try:
+        if time.time() - path.stat().st_mtime < HTTP_CACHE_TTL:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            return cached["status"], cached["data"]
+    except (OSError, ValueError, KeyError):
+        pass  # not cached (or unreadable): fetch it
+
+    for attempt in range(RATE_LIMIT_RETRIES):
+        limiter.wait()
+        resp = http_session().request(method, url, **kwargs)
+        if resp.status_code != 429 or attempt == RATE_LIMIT_RETRIES - 1:
+            break
+        delay = retry_delay(resp, attempt)
+        print(f"  Rate limited, retrying in {delay:.0f}s...")
+        time.sleep(delay)
+
+    data = resp.json() if resp.status_code == 200 else None
+    if resp.status_code in CACHEABLE_STATUS:
+        HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"status": resp.status_code, "data": data}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    return resp.status_code, data
+
+
+def dblp_authors(info: dict) -> list[str]:
+    """Author names from a DBLP hit, whose "author" is a dict for a single author."""
+    authors_data = info.get("authors", {}).get("author", [])
+    if isinstance(authors_data, dict):
+        authors_data = [authors_data]
+    return [a.get("text", a) if isinstance(a, dict) else a for a in authors_data]
+
+
+def fetch_tog_page(offset: int, batch_size: int, limiter: RateLimiter) -> dict | None:
+    """Fetch one page of TOG search hits from DBLP (None on error)."""
+    url = f"{DBLP_API}?q=stream:streams/journals/tog:&format=json&h={batch_size}&f={offset}"
+    print(f"  Fetching offset {offset}...")
+
+    try:
+        status, data = fetch_json("GET", url, limiter, timeout=30)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
+    except Exception as e:
+        print(f"  Error at offset {offset}: {e}")
+        return None
+    return data["result"]["hits"]
+
 
 def fetch_tog_papers() -> list[dict]:
     """Fetch all TOG (Transactions on Graphics) papers from DBLP."""
     print("\n=== Fetching TOG papers ===")
     all_papers = []
-    offset = 0
     batch_size = 1000
-
-    while True:
-        url = f"{DBLP_API}?q=stream:streams/journals/tog:&format=json&h={batch_size}&f={offset}"
-        print(f"  Fetching offset {offset}...")
-
-        try:
-            with urllib.request.urlopen(url, timeout=30) as resp:
-                data = json.loads(resp.read().decode())
-        except Exception as e:
-            print(f"  Error: {e}")
-            break
-
-        hits = data["result"]["hits"].get("hit", [])
-        if not hits:
-            break
-
-        for hit in hits:
+    limiter = RateLimiter(DBLP_PAGE_INTERVAL)
+
+    # The first page reports the total hit count, so the remaining pages
+    # can be fetched concurrently instead of paging until an empty one
+    first = fetch_tog_page(0, batch_size, limiter)
+    pages = [first]
+    if first is not None:
+        offsets = range(batch_size, int(first.get("@total", 0)), batch_size)
+        with ThreadPoolExecutor(max_workers=DBLP_WORKERS) as pool:
+            pages += pool.map(lambda offset: fetch_tog_page(offset, batch_size, limiter), offsets)
+
+    for hits in pages:
+        for hit in (hits or {}).get("hit", []):
             info = hit["info"]
-            authors_data = info.get("authors", {}).get("author", [])
-            if isinstance(authors_data, dict):
-                authors_data = [authors_data]
-            authors = [a.get("text", a) if isinstance(a, dict) else a for a in authors_data]
+            authors = dblp_authors(info)
 
             paper = {
                 "dblp_key": info.get("key"),
@@ -68,9 +217,6 @@ def fetch_tog_papers() -> list[dict]:
             }
             all_papers.append(paper)
 
-        offset += len(hits)
-        time.sleep(0.3)
-
     print(f"  Total TOG papers: {len(all_papers)}")
     return all_papers
 
@@ -87,16 +233,42 @@ def is_conference_paper(info: dict) -> bool:
         return False
 
     # Conference papers have page numbers like "21:1-21:9" or "53-59" or just "73"
-    if pages:
-        pages_str = str(pages)
-        if re.match(r"^\d+:\d+-\d+:\d+$", pages_str):  # Article format: 21:1-21:9
-            return True
-        if re.match(r"^\d+-\d+$", pages_str):  # Page range: 53-59
-            return True
-        if re.match(r"^\d+$", pages_str):  # Single number: 73
-            return True
+    return bool(pages) and CONF_PAGES_RE.match(str(pages)) is not None
 
-    return False
+
+def fetch_siggraph_conf_year(venue: str, year: int, limiter: RateLimiter) -> list[dict]:
+    """Fetch one year of SIGGRAPH ("siggraph") or SIGGRAPH Asia ("siggrapha") track papers."""
+    url = f"{DBLP_API}?q=streamid:conf/{venue}:+year:{year}:&format=json&h=500"
+
+    try:
+        status, data = fetch_json("GET", url, limiter, timeout=30)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
+    except Exception as e:
+        print(f"  Error fetching {venue} {year}: {e}")
+        return []
+
+    papers = []
+    for hit in data["result"]["hits"].get("hit", []):
+        info = hit["info"]
+        if not is_conference_paper(info):
+            continue
+
+        authors = dblp_authors(info)
+
+        paper = {
+            "dblp_key": info.get("key"),
+            "title": info.get("title"),
+            "authors": authors,
+            "venue": info.get("venue"),
+            "year": int(info.get("year", 0)),
+            "pages": info.get("pages"),
+            "doi": info.get("doi"),
+            "url": info.get("ee"),
+            "type": "conf_track",
+        }
+        papers.append(paper)
+    return papers
 
 
 def fetch_siggraph_conf_papers() -> list[dict]:
@@ -104,48 +276,16 @@ def fetch_siggraph_conf_papers() -> list[dict]:
     print("\n=== Fetching conference track papers ===")
     all_papers = []
 
-    for venue in ["siggraph", "siggrapha"]:
-        for year in range(2022, 2030):
-            url = f"{DBLP_API}?q=streamid:conf/{venue}:+year:{year}:&format=json&h=500"
-
-            try:
-                with urllib.request.urlopen(url, timeout=30) as resp:
-                    data = json.loads(resp.read().decode())
-            except Exception as e:
-                print(f"  Error fetching {venue} {year}: {e}")
-                continue
-
-            papers = []
-            for hit in data["result"]["hits"].get("hit", []):
-                info = hit["info"]
-                if not is_conference_paper(info):
-                    continue
-
-                authors_data = info.get("authors", {}).get("author", [])
-                if isinstance(authors_data, dict):
-                    authors_data = [authors_data]
-                authors = [a.get("text", a) if isinstance(a, dict) else a for a in authors_data]
-
-                paper = {
-                    "dblp_key": info.get("key"),
-                    "title": info.get("title"),
-                    "authors": authors,
-                    "venue": info.get("venue"),
-                    "year": int(info.get("year", 0)),
-                    "pages": info.get("pages"),
-                    "doi": info.get("doi"),
-                    "url": info.get("ee"),
-                    "type": "conf_track",
-                }
-                papers.append(paper)
-
+    jobs = [(venue, year) for venue in ["siggraph", "siggrapha"] for year in range(2022, 2030)]
+    limiter = RateLimiter(DBLP_INTERVAL)
+    with ThreadPoolExecutor(max_workers=DBLP_WORKERS) as pool:
+        results = pool.map(lambda job: fetch_siggraph_conf_year(*job, limiter), jobs)
+        for (venue, year), papers in zip(jobs, results):
             if papers:
                 venue_name = "SIGGRAPH" if venue == "siggraph" else "SIGGRAPH Asia"
                 print(f"  {venue_name} {year}: {len(papers)} papers")
                 all_papers.extend(papers)
 
-            time.sleep(0.3)
-
     print(f"  Total conference track papers: {len(all_papers)}")
     return all_papers
 
@@ -160,107 +300,93 @@ def is_old_technical_paper(info: dict) -> bool:
         return False
     if paper_type not in ("Conference and Workshop Papers", ""):
         return False
-    if pages and re.match(r"^\d+-\d+$", str(pages)):
+    if pages and PAGE_RANGE_RE.match(str(pages)):
         return True
     return False
 
 
-def fetch_old_siggraph_papers() -> list[dict]:
-    """Fetch older SIGGRAPH papers (1974-2001)."""
-    print("\n=== Fetching older SIGGRAPH papers (1974-2001) ===")
-    all_papers = []
+def fetch_old_siggraph_year(year: int, limiter: RateLimiter) -> list[dict]:
+    """Fetch one year of older SIGGRAPH technical papers."""
+    url = f"{DBLP_API}?q=streamid:conf/siggraph:+year:{year}:&format=json&h=500"
 
-    for year in range(1974, 2002):
-        url = f"{DBLP_API}?q=streamid:conf/siggraph:+year:{year}:&format=json&h=500"
+    try:
+        status, data = fetch_json("GET", url, limiter, timeout=30)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
+    except Exception as e:
+        print(f"  Error fetching {year}: {e}")
+        return []
 
-        try:
-            with urllib.request.urlopen(url, timeout=30) as resp:
-                data = json.loads(resp.read().decode())
-        except Exception as e:
-            print(f"  Error fetching {year}: {e}")
+    papers = []
+    for hit in data["result"]["hits"].get("hit", []):
+        info = hit["info"]
+        if not is_old_technical_paper(info):
             continue
 
-        papers = []
-        for hit in data["result"]["hits"].get("hit", []):
-            info = hit["info"]
-            if not is_old_technical_paper(info):
-                continue
+        authors = dblp_authors(info)
+
+        paper = {
+            "dblp_key": info.get("key"),
+            "title": info.get("title"),
+            "authors": authors,
+            "venue": "SIGGRAPH",
+            "year": int(info.get("year", 0)),
+            "pages": info.get("pages"),
+            "doi": info.get("doi"),
+            "url": info.get("ee"),
+            "type": "old_siggraph",
+        }
+        papers.append(paper)
+    return papers
 
-            authors_data = info.get("authors", {}).get("author", [])
-            if isinstance(authors_data, dict):
-                authors_data = [authors_data]
-            authors = [a.get("text", a) if isinstance(a, dict) else a for a in authors_data]
 
-            paper = {
-                "dblp_key": info.get("key"),
-                "title": info.get("title"),
-                "authors": authors,
-                "venue": "SIGGRAPH",
-                "year": int(info.get("year", 0)),
-                "pages": info.get("pages"),
-                "doi": info.get("doi"),
-                "url": info.get("ee"),
-                "type": "old_siggraph",
-            }
-            papers.append(paper)
+def fetch_old_siggraph_papers() -> list[dict]:
+    """Fetch older SIGGRAPH papers (1974-2001)."""
+    print("\n=== Fetching older SIGGRAPH papers (1974-2001) ===")
+    all_papers = []
 
-        if papers:
-            print(f"  SIGGRAPH {year}: {len(papers)} papers")
-        all_papers.extend(papers)
-        time.sleep(0.3)
+    years = range(1974, 2002)
+    limiter = RateLimiter(DBLP_INTERVAL)
+    with ThreadPoolExecutor(max_workers=DBLP_WORKERS) as pool:
+        for year, papers in zip(years, pool.map(lambda y: fetch_old_siggraph_year(y, limiter), years)):
+            if papers:
+                print(f"  SIGGRAPH {year}: {len(papers)} papers")
+            all_papers.extend(papers)
 
     print(f"  Total older SIGGRAPH papers: {len(all_papers)}")
     return all_papers
 
 
+def add_unique(merged: list[dict], seen: set[str], papers: list[dict]) -> int:
+    """
+    Append papers whose DOI and DBLP key are both unseen; returns how many
+    were added. DOIs (lowercased) and keys share one set since they never
+    collide ("10.1145/..." vs "journals/tog/...").
+    """
+    added = 0
+    for p in papers:
+        ids = [i for i in ((p.get("doi") or "").lower(), p.get("dblp_key")) if i]
+        if any(i in seen for i in ids):
+            continue
+        seen.update(ids)
+        merged.append(p)
+        added += 1
+    return added
+
+
 def merge_papers(tog: list, conf: list, old: list) -> list[dict]:
     """Merge paper lists, removing duplicates."""
     print("\n=== Merging papers ===")
-    all_dois = set()
-    all_keys = set()
+    seen = set()
     merged = []
 
-    # Start with TOG papers
+    # Start with TOG papers (kept even if TOG itself has duplicates),
+    # then add conference track and older SIGGRAPH papers
     for p in tog:
-        doi = p.get("doi")
-        key = p.get("dblp_key")
-        if doi:
-            all_dois.add(doi.lower())
-        if key:
-            all_keys.add(key)
-        merged.append(p)
-
-    # Add conference track papers
-    conf_added = 0
-    for p in conf:
-        doi = p.get("doi")
-        key = p.get("dblp_key")
-        if doi and doi.lower() in all_dois:
-            continue
-        if key and key in all_keys:
-            continue
-        if doi:
-            all_dois.add(doi.lower())
-        if key:
-            all_keys.add(key)
-        merged.append(p)
-        conf_added += 1
-
-    # Add older SIGGRAPH papers
-    old_added = 0
-    for p in old:
-        doi = p.get("doi")
-        key = p.get("dblp_key")
-        if doi and doi.lower() in all_dois:
-            continue
-        if key and key in all_keys:
-            continue
-        if doi:
-            all_dois.add(doi.lower())
-        if key:
-            all_keys.add(key)
-        merged.append(p)
-        old_added += 1
+        seen.update(i for i in ((p.get("doi") or "").lower(), p.get("dblp_key")) if i)
+    merged.extend(tog)
+    conf_added = add_unique(merged, seen, conf)
+    old_added = add_unique(merged, seen, old)
 
     print(f"  TOG papers: {len(tog)}")
     print(f"  Conference track added: {conf_added}")
@@ -269,6 +395,35 @@ def merge_papers(tog: list, conf: list, old: list) -> list[dict]:
     return merged
 
 
+def fetch_s2_batch(dois: list[str], limiter: RateLimiter) -> dict[str, dict] | None:
+    """Look up a batch of DOIs on Semantic Scholar; returns lowercased DOI -> data, or None on error."""
+    try:
+        status, results = fetch_json(
+            "POST",
+            S2_BATCH_API,
+            limiter,
+            params={"fields": "title,abstract,citationCount,year,paperId,externalIds"},
+            json={"ids": [f"DOI:{doi}" for doi in dois]},
+            timeout=30
+        )
+    except requests.RequestException as e:
+        print(f"  Batch error: {e}")
+        return None
+
+    if status != 200:
+        print(f"  Batch error {status}")
+        return None
+
+    doi_to_data = {}
+    for item in results:
+        if item is not None:
+            ext_ids = item.get("externalIds", {})
+            doi = ext_ids.get("DOI")
+            if doi:
+                doi_to_data[doi.lower()] = item
+    return doi_to_data
+
+
 def enrich_with_semantic_scholar(papers: list[dict], batch_size: int = 100) -> list[dict]:
     """Enrich papers with abstracts from Semantic Scholar."""
     print("\n=== Enriching with Semantic Scholar abstracts ===")
@@ -276,56 +431,30 @@ def enrich_with_semantic_scholar(papers: list[dict], batch_size: int = 100) -> l
     papers_with_doi = [(i, p) for i, p in enumerate(papers) if p.get("doi")]
     print(f"  Papers with DOI: {len(papers_with_doi)}")
 
+    batches = [papers_with_doi[i:i + batch_size] for i in range(0, len(papers_with_doi), batch_size)]
+    limiter = RateLimiter(S2_INTERVAL)
+
     total_found = 0
-    for batch_start in range(0, len(papers_with_doi), batch_size):
-        batch = papers_with_doi[batch_start:batch_start + batch_size]
-        dois = [p["doi"] for _, p in batch]
-
-        print(f"  Batch {batch_start // batch_size + 1}/{(len(papers_with_doi) + batch_size - 1) // batch_size}...", end=" ", flush=True)
-
-        try:
-            response = requests.post(
-                S2_BATCH_API,
-                params={"fields": "title,abstract,citationCount,year,paperId,externalIds"},
-                json={"ids": [f"DOI:{doi}" for doi in dois]},
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                results = response.json()
-                doi_to_data = {}
-                for item in results:
-                    if item is not None:
-                        ext_ids = item.get("externalIds", {})
-                        doi = ext_ids.get("DOI")
-                        if doi:
-                            doi_to_data[doi.lower()] = item
-
-                found = 0
-                for idx, paper in batch:
-                    doi_lower = paper["doi"].lower()
-                    if doi_lower in doi_to_data:
-                        data = doi_to_data[doi_lower]
-                        papers[idx]["abstract"] = data.get("abstract")
-                        papers[idx]["s2_id"] = data.get("paperId")
-                        papers[idx]["citation_count"] = data.get("citationCount")
-                        if data.get("abstract"):
-                            found += 1
-
-                total_found += found
-                print(f"found {found}")
-
-            elif response.status_code == 429:
-                print("rate limited, waiting 60s...")
-                time.sleep(60)
+    with ThreadPoolExecutor(max_workers=S2_WORKERS) as pool:
+        results = pool.map(lambda batch: fetch_s2_batch([p["doi"] for _, p in batch], limiter), batches)
+        # Merge on this thread, in batch order, as each batch completes
+        for n, (batch, doi_to_data) in enumerate(zip(batches, results), 1):
+            if doi_to_data is None:
                 continue
-            else:
-                print(f"error {response.status_code}")
 
-        except requests.RequestException as e:
-            print(f"error: {e}")
+            found = 0
+            for idx, paper in batch:
+                doi_lower = paper["doi"].lower()
+                if doi_lower in doi_to_data:
+                    data = doi_to_data[doi_lower]
+                    papers[idx]["abstract"] = data.get("abstract")
+                    papers[idx]["s2_id"] = data.get("paperId")
+                    papers[idx]["citation_count"] = data.get("citationCount")
+                    if data.get("abstract"):
+                        found += 1
 
-        time.sleep(1)
+            total_found += found
+            print(f"  Batch {n}/{len(batches)}: found {found}", flush=True)
 
     print(f"  Total abstracts from Semantic Scholar: {total_found}")
     return papers
@@ -335,23 +464,19 @@ def reconstruct_abstract(inverted_index: dict) -> str:
     """Reconstruct abstract from OpenAlex inverted index format."""
     if not inverted_index:
         return ""
-    words = {}
+    # Positions are (nearly) dense from 0, so place words directly by index
+    # instead of collecting them in a dict and sorting the keys
+    words = [None] * (1 + max(max(positions, default=-1) for positions in inverted_index.values()))
     for word, positions in inverted_index.items():
         for pos in positions:
             words[pos] = word
-    return " ".join(words[i] for i in sorted(words.keys()))
+    return " ".join(w for w in words if w is not None)
 
 
 def clean_abstract(text: str) -> str:
     """Remove copyright boilerplate from abstract."""
-    patterns = [
-        r"^.*?Permission to make digital or hard copies.*?(?:Abstract|ABSTRACT)\s*",
-        r"^.*?©\s*\d{4}\s*ACM.*?(?:Abstract|ABSTRACT)\s*",
-        r"^.*?Request permissions from.*?(?:Abstract|ABSTRACT)\s*",
-    ]
-    for pattern in patterns:
-        text = re.sub(pattern, "", text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s*#.*?(?:Abstract|ABSTRACT)\s*", "", text, flags=re.DOTALL)
+    for pattern in BOILERPLATE_RES:
+        text = pattern.sub("", text)
     return text.strip()
 
 
@@ -360,26 +485,42 @@ def is_valid_abstract(text: str) -> bool:
     if not text or len(text) < 50:
         return False
 
-    # Bad patterns that indicate scraped page metadata instead of abstract
-    bad_patterns = [
-        "article ",  # Starts with "article " (page navigation)
-        "Authors Info",
-        "View Profile",
-        "Share on",
-        "ACM Transactions on Graphics",
-        "ACM SIGGRAPH",
-        "Info & Claims",
-        "Citations",
-        "Downloads",
-        "Publication History",
-    ]
-
-    text_start = text[:300].lower()
-    for pattern in bad_patterns:
-        if pattern.lower() in text_start:
-            return False
-
-    return True
+    # One scan of the first 300 characters for any metadata phrase
+    return PAGE_METADATA_RE.search(text, 0, 300) is None
+
+
+def fetch_openalex_abstracts(dois: list[str], limiter: RateLimiter) -> dict[str, str]:
+    """Fetch cleaned abstracts for a batch of DOIs from OpenAlex; returns lowercased DOI -> abstract."""
+    if len(dois) == 1:
+        url, params = f"{OPENALEX_API}/doi:{dois[0]}", None
+    else:
+        url = OPENALEX_API
+        params = {
+            "filter": "doi:" + "|".join(dois),
+            "per-page": len(dois),
+            "select": "doi,abstract_inverted_index",
+        }
+
+    try:
+        status, data = fetch_json("GET", url, limiter, params=params, timeout=30)
+    except requests.RequestException:
+        return {}
+    if status != 200:
+        return {}
+
+    abstracts = {}
+    for work in data["results"] if params else [data]:
+        # OpenAlex reports DOIs as "https://doi.org/10...."
+        doi = (work.get("doi") or "").lower().removeprefix("https://doi.org/")
+        inv_idx = work.get("abstract_inverted_index")
+        if doi and inv_idx:
+            abstract = clean_abstract(reconstruct_abstract(inv_idx))
+            if is_valid_abstract(abstract):
+                abstracts[doi] = abstract
+    if len(dois) == 1 and abstracts:
+        # Looked up by path, so keep it even if OpenAlex normalized the DOI
+        abstracts = {dois[0].lower(): next(iter(abstracts.values()))}
+    return abstracts
 
 
 def enrich_with_openalex(papers: list[dict]) -> list[dict]:
@@ -389,31 +530,28 @@ def enrich_with_openalex(papers: list[dict]) -> list[dict]:
     missing = [(i, p) for i, p in enumerate(papers) if not p.get("abstract") and p.get("doi")]
     print(f"  Papers missing abstracts (with DOI): {len(missing)}")
 
-    found = 0
-    for idx, (paper_idx, paper) in enumerate(missing):
-        doi = paper["doi"]
-
-        if idx % 100 == 0 and idx > 0:
-            print(f"  Progress: {idx}/{len(missing)} (found: {found})", flush=True)
-
-        try:
-            resp = requests.get(f"{OPENALEX_API}/doi:{doi}", timeout=15)
-            if resp.status_code == 200:
-                data = resp.json()
-                inv_idx = data.get("abstract_inverted_index")
-                if inv_idx:
-                    abstract = clean_abstract(reconstruct_abstract(inv_idx))
-                    if is_valid_abstract(abstract):
-                        papers[paper_idx]["abstract"] = abstract
-                        papers[paper_idx]["abstract_source"] = "openalex"
-                        found += 1
-            elif resp.status_code == 429:
-                print("  Rate limited, waiting 10s...")
-                time.sleep(10)
-        except requests.RequestException:
-            pass
+    # Look DOIs up OPENALEX_BATCH at a time through the filter endpoint; the
+    # few containing filter syntax ("," or "|") go one by one via /works/doi:
+    dois = sorted({p["doi"] for _, p in missing})
+    plain = [d for d in dois if "," not in d and "|" not in d]
+    batches = [plain[i:i + OPENALEX_BATCH] for i in range(0, len(plain), OPENALEX_BATCH)]
+    batches += [[d] for d in dois if "," in d or "|" in d]
+
+    abstracts = {}
+    limiter = RateLimiter(OPENALEX_INTERVAL)
+    with ThreadPoolExecutor(max_workers=OPENALEX_WORKERS) as pool:
+        for n, batch_abstracts in enumerate(pool.map(lambda b: fetch_openalex_abstracts(b, limiter), batches), 1):
+            abstracts.update(batch_abstracts)
+            if n % 10 == 0:
+                print(f"  Progress: {n}/{len(batches)} requests (found: {len(abstracts)})", flush=True)
 
-        time.sleep(0.12)
+    found = 0
+    for paper_idx, paper in missing:
+        abstract = abstracts.get(paper["doi"].lower())
+        if abstract:
+            papers[paper_idx]["abstract"] = abstract
+            papers[paper_idx]["abstract_source"] = "openalex"
+            found += 1
 
     print(f"  Total abstracts from OpenAlex: {found}")
     return papers
@@ -434,9 +572,9 @@ def main():
     # Merge
     papers = merge_papers(tog_papers, conf_papers, old_papers)
 
-    # Save intermediate result
+    # Save intermediate result (a checkpoint only, so compact rather than indented)
     with open(DATA_DIR / "all_papers.json", "w", encoding="utf-8") as f:
-        json.dump(papers, f, indent=2, ensure_ascii=False)
+        json.dump(papers, f, ensure_ascii=False, separators=(",", ":"))
     print(f"\nSaved intermediate to {DATA_DIR / 'all_papers.json'}")
 
     # Enrich with abstracts
@@ -47,21 +47,38 @@ def main():
 
     # Load model
     print(f"\nLoading model {MODEL_NAME}...")
-    model = SentenceTransformer(MODEL_NAME)
-
-    # Prepare texts
+    model = SentenceTransformer(MODEL_NAME)  # picks CUDA automatically when available
+    batch_size = 32
+    if model.device.type == "cuda":
+        # Half precision runs on tensor cores, and the freed memory allows larger batches
+        model.half()
+        batch_size = 256
+    print(f"Encoding on {model.device} with batch size {batch_size}")
+
+    # Prepare texts, encoding each distinct text only once (e.g. title-only
+    # entries that share a title)
     texts = [paper_text(p) for p in papers]
+    unique_index = {}
+    for text in texts:
+        unique_index.setdefault(text, len(unique_index))
+    unique_texts = list(unique_index)
 
     # Compute embeddings
-    print(f"\nComputing embeddings for {len(texts)} papers...")
+    print(f"\nComputing embeddings for {len(texts)} papers ({len(unique_texts)} distinct texts)...")
     embeddings = model.encode(
-        texts,
-        batch_size=32,
+        unique_texts,
+        batch_size=batch_size,
         show_progress_bar=True,
         convert_to_numpy=True,
+        # Unit-length rows, so the app's cosine similarity is a plain dot product
+        normalize_embeddings=True,
     )
 
-    # Save
+    # Scatter back to one row per paper
+    embeddings = embeddings[[unique_index[text] for text in texts]]
+
+    # Save as float32 (the app's BLAS similarity path) even if encoded in half precision
+    embeddings = embeddings.astype(np.float32)
     np.save(EMBEDDINGS_FILE, embeddings)
 
     print("\n" + "=" * 60)
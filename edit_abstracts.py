@@ -7,7 +7,7 @@ Lets you enter an abstract or remove a paper from the database.
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 
-from paper_io import load_papers, save_papers
+from paper_io import DATA_FILE, DELTA_FILE, compact_abstracts, load_papers, replay_abstracts, save_papers
 
 PORT = 8899
 
@@ -48,14 +48,38 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
 
 class Handler(BaseHTTPRequestHandler):
+    # (mtime, papers) of the last load or save, reused while the file on disk
+    # is unchanged so each request doesn't re-parse the whole database
+    _cache = (None, None)
+
     def log_message(self, format, *args):
         pass  # Suppress request logs
 
+    def load(self):
+        """Load papers, re-reading DATA_FILE only if it changed since last time."""
+        if DELTA_FILE.exists():
+            # Abstracts left by an interrupted fetch: fold them into papers.json
+            # now, so they show up here and a later compact can't replay them
+            # over edits made in this editor
+            papers = load_papers()
+            replay_abstracts(papers)
+            compact_abstracts(papers)
+        mtime = DATA_FILE.stat().st_mtime_ns
+        cached_mtime, papers = Handler._cache
+        if cached_mtime != mtime:
+            papers = load_papers()
+            Handler._cache = (mtime, papers)
+        return papers
+
+    def save(self, papers):
+        save_papers(papers)
+        Handler._cache = (DATA_FILE.stat().st_mtime_ns, papers)
+
     def do_GET(self):
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
 
-        papers = load_papers()
+        papers = self.load()
         missing = [(i, p) for i, p in enumerate(papers) if not p.get("abstract")]
 
         page = int(params.get("page", ["0"])[0])
@@ -67,21 +91,22 @@ class Handler(BaseHTTPRequestHandler):
         end = min(start + per_page, total)
         page_items = missing[start:end]
 
-        content = ""
+        # Collect fragments and join once rather than growing one string
+        parts = []
         if msg:
-            content += f'<div class="success">{msg}</div>'
+            parts.append(f'<div class="success">{msg}</div>')
 
         with_abstract = sum(1 for p in papers if p.get("abstract"))
-        content += f'<div class="stats">Total papers: {len(papers)} | With abstract: {with_abstract} | Missing: {total}</div>'
+        parts.append(f'<div class="stats">Total papers: {len(papers)} | With abstract: {with_abstract} | Missing: {total}</div>')
 
         # Pagination
-        content += '<div class="nav">'
+        parts.append('<div class="nav">')
         if page > 0:
-            content += f'<a href="/?page={page-1}">&larr; Prev</a>'
-        content += f'<span style="padding:8px">Page {page+1} of {(total + per_page - 1) // per_page} (showing {start+1}-{end} of {total})</span>'
+            parts.append(f'<a href="/?page={page-1}">&larr; Prev</a>')
+        parts.append(f'<span style="padding:8px">Page {page+1} of {(total + per_page - 1) // per_page} (showing {start+1}-{end} of {total})</span>')
         if end < total:
-            content += f'<a href="/?page={page+1}">Next &rarr;</a>'
-        content += '</div>'
+            parts.append(f'<a href="/?page={page+1}">Next &rarr;</a>')
+        parts.append('</div>')
 
         for idx, paper in page_items:
             title = paper.get("title", "Unknown")
@@ -93,7 +118,7 @@ class Handler(BaseHTTPRequestHandler):
             s2_id = paper.get("s2_id", "")
             s2_link = f'<a href="https://www.semanticscholar.org/paper/{s2_id}" target="_blank">S2</a>' if s2_id else ""
 
-            content += f'''
+            parts.append(f'''
             <div class="paper" id="paper-{idx}">
                 <h3>{title}</h3>
                 <div class="meta">
@@ -102,6 +127,7 @@ class Handler(BaseHTTPRequestHandler):
                 </div>
                 <form method="POST" action="/save">
                     <input type="hidden" name="idx" value="{idx}">
+                    <input type="hidden" name="key" value="{paper.get("dblp_key", "")}">
                     <input type="hidden" name="page" value="{page}">
                     <textarea name="abstract" placeholder="Paste abstract here..."></textarea>
                     <div class="actions">
@@ -110,13 +136,14 @@ class Handler(BaseHTTPRequestHandler):
                             onclick="return confirm('Remove this paper from the database?')">Remove Paper</button>
                     </div>
                 </form>
-            </div>'''
+            </div>''')
 
-        html = HTML_TEMPLATE.replace("{content}", content)
+        body = HTML_TEMPLATE.replace("{content}", "".join(parts)).encode()
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(html.encode())
+        self.wfile.write(body)
 
     def do_POST(self):
         length = int(self.headers.get("Content-Length", 0))
@@ -124,24 +151,32 @@ class Handler(BaseHTTPRequestHandler):
         params = parse_qs(body)
 
         idx = int(params["idx"][0])
+        key = params.get("key", [""])[0]
         page = params.get("page", ["0"])[0]
         action = params["action"][0]
 
-        papers = load_papers()
+        papers = self.load()
 
-        if action == "save":
+        # The form may come from a stale page (e.g. another tab removed a
+        # paper, shifting later indices), so confirm the row by its key
+        if key and (idx >= len(papers) or papers[idx].get("dblp_key") != key):
+            idx = next((i for i, p in enumerate(papers) if p.get("dblp_key") == key), None)
+
+        if idx is None:
+            msg = f"Paper not found: {key}"
+        elif action == "save":
             abstract = params.get("abstract", [""])[0].strip()
             if abstract:
                 papers[idx]["abstract"] = abstract
                 papers[idx]["abstract_source"] = "manual"
-                save_papers(papers)
+                self.save(papers)
                 msg = f"Saved abstract for: {papers[idx].get('title', '?')}"
             else:
                 msg = "No abstract provided, skipped."
         elif action == "delete":
             title = papers[idx].get("title", "?")
             papers.pop(idx)
-            save_papers(papers)
+            self.save(papers)
             msg = f"Removed paper: {title}"
 
         self.send_response(303)
@@ -150,8 +185,6 @@ class Handler(BaseHTTPRequestHandler):
 
 
 if __name__ == "__main__":
-    from paper_io import DATA_FILE
-
     print(f"Starting server at http://localhost:{PORT}")
     print(f"Data file: {DATA_FILE}")
     papers = load_papers()
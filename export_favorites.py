@@ -18,13 +18,12 @@ def main():
     with open(RATINGS_FILE, "r", encoding="utf-8") as f:
         ratings = json.load(f)
 
-    paper_by_key = {p["dblp_key"]: p for p in papers}
-
-    # Collect 5-star papers
-    favorites = []
-    for key, score in ratings.items():
-        if score == 5 and key in paper_by_key:
-            favorites.append(paper_by_key[key])
+    # Collect 5-star papers in one pass, without indexing every paper by key.
+    # Keyed by dblp_key so a key repeated in papers.json is emitted once
+    # (the last entry wins, as with the old per-key lookup).
+    five_star = {key for key, score in ratings.items() if score == 5}
+    favorites = list({p["dblp_key"]: p for p in papers
+                      if p.get("dblp_key") in five_star}.values())
 
     # Sort by year (oldest first), then title
     favorites.sort(key=lambda p: (p.get("year", 0), p.get("title", "")))
@@ -3,88 +3,163 @@
 Fetch abstracts from the Crossref API using paper DOIs.
 """
 
-import json
 import re
-import time
-import urllib.request
-import urllib.error
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+
+from paper_io import (
+    load_papers, append_abstract, append_keys, compact_abstracts, iter_missing_abstract, load_key_set,
+    replay_abstracts, DATA_FILE,
+)
+
 DATA_DIR = Path(__file__).parent / "data"
-INPUT_FILE = DATA_DIR / "papers.json"
+INPUT_FILE = DATA_FILE
 OUTPUT_FILE = INPUT_FILE
+# DOIs Crossref has no record of, skipped on later runs
+NOT_FOUND_FILE = DATA_DIR / ".crossref_404.txt"
 
 CROSSREF_API = "https://api.crossref.org/works"
 # Polite pool: include contact email for faster rate limits
 HEADERS = {"User-Agent": "PaperRec/1.0 (mailto:paper-rec@example.com)"}
+# Polite pool allows ~50 req/s; a handful of in-flight requests stays well below that
+WORKERS = 8
+BATCH_SIZE = 50  # DOIs per filter query, keeping the URL well under length limits
+
+JATS_TAG_RE = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+
+_thread_local = threading.local()
+
+
+def http_session() -> requests.Session:
+    """requests.Session for the current thread, reused so connections stay open."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+        session.headers.update(HEADERS)
+    return session
 
 
 def clean_jats_abstract(raw: str) -> str:
     """Strip JATS XML tags and normalize whitespace."""
-    text = re.sub(r"<[^>]+>", "", raw)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = JATS_TAG_RE.sub("", raw)
+    text = WHITESPACE_RE.sub(" ", text).strip()
     return text
 
 
-def fetch_abstract_from_crossref(doi: str) -> str | None:
-    """Fetch abstract for a DOI from Crossref. Returns cleaned text or None."""
-    url = f"{CROSSREF_API}/{doi}"
-    req = urllib.request.Request(url, headers=HEADERS)
+def fetch_abstracts_from_crossref(dois: list[str]) -> tuple[dict[str, str], set[str]]:
+    """Fetch cleaned abstracts for a batch of DOIs from Crossref.
+
+    Returns (lowercased DOI -> abstract, lowercased DOIs not found). For a
+    single DOI "not found" is a confirmed 404; for a batch it is the DOIs the
+    filter query left out, which may just be normalized differently and need
+    confirming one by one.
+    """
+    if len(dois) == 1:
+        url, params = f"{CROSSREF_API}/{dois[0]}", None
+    else:
+        url = CROSSREF_API
+        params = {
+            "filter": ",".join(f"doi:{doi}" for doi in dois),
+            "rows": len(dois),
+            "select": "DOI,abstract",
+        }
+
     try:
-        resp = urllib.request.urlopen(req, timeout=15)
-        data = json.loads(resp.read())
-        raw = data.get("message", {}).get("abstract")
-        if raw:
+        resp = http_session().get(url, params=params, timeout=30)
+        if resp.status_code == 404 and len(dois) == 1:
+            # Only a /works/{doi} lookup confirms that a DOI is unknown
+            return {}, {dois[0].lower()}
+        if resp.status_code != 200:
+            print(f"    HTTP {resp.status_code} for {len(dois)} DOIs starting {dois[0]}", flush=True)
+            return {}, set()
+        message = resp.json().get("message", {})
+    except Exception as e:
+        print(f"    Error for {len(dois)} DOIs starting {dois[0]}: {e}", flush=True)
+        return {}, set()
+
+    works = message.get("items", []) if params else [message]
+    if params:
+        # The filter query simply omits DOIs it doesn't match
+        missing = {d.lower() for d in dois} - {(w.get("DOI") or "").lower() for w in works}
+    else:
+        missing = set()
+
+    abstracts = {}
+    for work in works:
+        doi = (work.get("DOI") or "").lower()
+        raw = work.get("abstract")
+        if doi and raw:
             cleaned = clean_jats_abstract(raw)
             if len(cleaned) > 50:
-                return cleaned
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            return None
-        print(f"    HTTP {e.code} for {doi}", flush=True)
-    except Exception as e:
-        print(f"    Error for {doi}: {e}", flush=True)
-    return None
+                abstracts[doi] = cleaned
+    if len(dois) == 1 and abstracts:
+        # Looked up by path, so keep it even if Crossref normalized the DOI
+        abstracts = {dois[0].lower(): next(iter(abstracts.values()))}
+    return abstracts, missing
 
 
 def main():
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        papers = json.load(f)
+    papers = load_papers()
+    replayed = replay_abstracts(papers)
+    if replayed:
+        print(f"Recovered {replayed} abstracts from an interrupted run")
 
+    not_found = load_key_set(NOT_FOUND_FILE)
     candidates = [
-        (i, p) for i, p in enumerate(papers) if p.get("doi") and not p.get("abstract")
+        (i, p) for i, p in iter_missing_abstract(papers, require_key="doi")
+        if p["doi"].lower() not in not_found
     ]
-    print(f"Papers with DOI but no abstract: {len(candidates)}")
+    print(f"Papers with DOI but no abstract: {len(candidates)} (skipping {len(not_found)} DOIs known missing from Crossref)")
+
+    by_doi = {}
+    for paper_idx, paper in candidates:
+        by_doi.setdefault(paper["doi"].lower(), []).append(paper_idx)
+
+    # Look DOIs up BATCH_SIZE at a time through the filter endpoint; the few
+    # containing "," (the filter separator) go one by one via /works/{doi}
+    dois = sorted({p["doi"] for _, p in candidates})
+    plain = [d for d in dois if "," not in d]
+    batches = [plain[i:i + BATCH_SIZE] for i in range(0, len(plain), BATCH_SIZE)]
+    batches += [[d] for d in dois if "," in d]
 
     found = 0
 
-    for idx, (paper_idx, paper) in enumerate(candidates):
-        doi = paper["doi"]
-        title = paper.get("title", "Unknown")[:60]
-        print(f"[{idx+1}/{len(candidates)}] {title}...", flush=True)
-
-        abstract = fetch_abstract_from_crossref(doi)
-        if abstract:
-            papers[paper_idx]["abstract"] = abstract
-            papers[paper_idx]["abstract_source"] = "crossref"
-            found += 1
-            print(f"  -> FOUND ({len(abstract)} chars)", flush=True)
-
-        # Checkpoint every 50
-        if idx % 50 == 0 and idx > 0:
-            print(
-                f"  === Checkpoint: {idx}/{len(candidates)} (found: {found}) ===",
-                flush=True,
-            )
-            with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-                json.dump(papers, f, ensure_ascii=False)
-
-        # Crossref polite pool: ~50 req/s allowed with contact info, but be gentle
-        time.sleep(0.2)
-
-    # Final save
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(papers, f, ensure_ascii=False)
+    def apply(abstracts):
+        nonlocal found
+        for doi, abstract in abstracts.items():
+            for paper_idx in by_doi.pop(doi, ()):
+                papers[paper_idx]["abstract"] = abstract
+                papers[paper_idx]["abstract_source"] = "crossref"
+                append_abstract(papers[paper_idx])
+                found += 1
+
+    # Requests run concurrently; results come back in batch order
+    omitted = []
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        for n, (batch, (abstracts, missing)) in enumerate(
+            zip(batches, pool.map(fetch_abstracts_from_crossref, batches)), 1
+        ):
+            apply(abstracts)
+            if len(batch) == 1:
+                append_keys(sorted(missing), NOT_FOUND_FILE)
+            else:
+                omitted.extend(sorted(missing))
+            print(f"  === Progress: {n}/{len(batches)} requests (found: {found}) ===", flush=True)
+
+        # DOIs a filter query left out are confirmed one by one; only real
+        # 404s are remembered, anything else is retried on the next run
+        if omitted:
+            print(f"  Re-checking {len(omitted)} DOIs missing from filter results...", flush=True)
+        for abstracts, missing in pool.map(fetch_abstracts_from_crossref, [[d] for d in omitted]):
+            apply(abstracts)
+            append_keys(sorted(missing), NOT_FOUND_FILE)
+
+    # Final save; found abstracts were already appended to the delta file as they arrived
+    compact_abstracts(papers)
 
     print(f"\nFetched {found} abstracts from Crossref")
 
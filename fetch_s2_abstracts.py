@@ -4,49 +4,91 @@ Fetch abstracts from Semantic Scholar using Playwright headless browser.
 This bypasses API restrictions by scraping the web page directly.
 """
 
+import asyncio
 import json
-import time
+import re
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+import requests
+from lxml import etree, html
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
-from paper_io import load_papers, save_papers, DATA_FILE
+from paper_io import (
+    load_papers, append_abstract, append_keys, compact_abstracts, iter_missing_abstract, load_key_set,
+    replay_abstracts, DATA_FILE,
+)
 
 DATA_DIR = Path(__file__).parent / "data"
 INPUT_FILE = DATA_FILE
 OUTPUT_FILE = INPUT_FILE
+# S2 ids whose paper page 404s, skipped on later runs
+NOT_FOUND_FILE = DATA_DIR / ".s2_404.txt"
 
 S2_BASE_URL = "https://www.semanticscholar.org/paper"
+UI_LABEL_RE = re.compile(r"TLDR|Expand|Collapse")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 
-def fetch_abstract_from_s2(page, s2_id: str, verbose: bool = False) -> str | None:
+def fetch_abstract_from_html(session: requests.Session, s2_id: str) -> tuple[int | None, str | None]:
+    """Try the server-rendered page first: its JSON-LD often carries the abstract.
+
+    Returns (HTTP status or None on a network error, abstract or None).
+    """
+    try:
+        resp = session.get(f"{S2_BASE_URL}/{s2_id}", timeout=15)
+    except requests.RequestException:
+        return None, None
+    if resp.status_code != 200 or not resp.content:
+        return resp.status_code, None
+
+    try:
+        tree = html.fromstring(resp.content)
+    except (etree.ParserError, ValueError):
+        # e.g. a whitespace-only body; let the browser path have a go
+        return resp.status_code, None
+    for script in tree.xpath('//script[@type="application/ld+json"]/text()'):
+        try:
+            data = json.loads(script)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data])
+        for item in items:
+            abstract = item.get("abstract") if isinstance(item, dict) else None
+            if isinstance(abstract, str):
+                abstract = abstract.strip()
+                if len(abstract) > 100 and not abstract.endswith("…"):
+                    return resp.status_code, abstract
+    return resp.status_code, None
+
+
+async def fetch_abstract_from_s2(page, s2_id: str, verbose: bool = False) -> str | None:
     """Fetch abstract from Semantic Scholar page using Playwright."""
     url = f"{S2_BASE_URL}/{s2_id}"
 
     try:
         if verbose:
             print(f"    Loading {url}...", flush=True)
-        page.goto(url, wait_until="domcontentloaded", timeout=30000)
-        time.sleep(2)  # Wait for JS to render
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await asyncio.sleep(2)  # Wait for JS to render
 
         # Check for bot detection
-        if "Human Verification" in page.content():
+        if "Human Verification" in await page.content():
             print(f"    Bot detected! Waiting 30s...", flush=True)
-            time.sleep(30)
+            await asyncio.sleep(30)
             return None
 
         # Try to click "Expand" button within the paper's abstract section
-        abstract_section = page.query_selector(
+        abstract_section = await page.query_selector(
             ".paper-detail-page__tldr-abstract"
         )
         if abstract_section:
-            expand_btn = abstract_section.query_selector('button:has-text("Expand")')
+            expand_btn = await abstract_section.query_selector('button:has-text("Expand")')
             if expand_btn:
                 if verbose:
                     print(f"    Clicking Expand button...", flush=True)
                 try:
-                    expand_btn.click()
-                    time.sleep(0.5)
+                    await expand_btn.click()
+                    await asyncio.sleep(0.5)
                 except:
                     pass
 
@@ -58,13 +100,11 @@ def fetch_abstract_from_s2(page, s2_id: str, verbose: bool = False) -> str | Non
         ]
 
         for selector in selectors:
-            abstract_el = page.query_selector(selector)
+            abstract_el = await page.query_selector(selector)
             if abstract_el:
-                text = abstract_el.inner_text().strip()
+                text = (await abstract_el.inner_text()).strip()
                 # Clean up UI text artifacts
-                for label in ("TLDR", "Expand", "Collapse"):
-                    text = text.replace(label, "")
-                text = text.strip()
+                text = UI_LABEL_RE.sub("", text).strip()
                 if verbose:
                     print(f"    Found text ({len(text)} chars): {text[:80]}...", flush=True)
                 # Skip truncated text (ends with ellipsis)
@@ -83,73 +123,117 @@ def fetch_abstract_from_s2(page, s2_id: str, verbose: bool = False) -> str | Non
     return None
 
 
-BATCH_SIZE = 7  # Restart browser session every N requests to avoid bot detection
+BATCH_SIZE = 7  # Rotate each worker's browser context every N requests to avoid bot detection
+WORKERS = 4  # Concurrent browser contexts sharing one browser
+REQUEST_DELAY = 5  # Seconds between requests, per worker
+ROTATE_COOLDOWN = 30  # Seconds a worker waits before opening a fresh context
+PROGRESS_EVERY = 5
 
 
-def new_browser_page(pw):
+async def new_browser_page(browser):
     """Create a fresh browser context and page."""
-    browser = pw.chromium.launch(
-        headless=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
-    context = browser.new_context(
+    context = await browser.new_context(
         viewport={"width": 1920, "height": 1080},
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        user_agent=USER_AGENT,
         locale="en-US",
     )
-    page = context.new_page()
-    page.add_init_script('Object.defineProperty(navigator, "webdriver", {get: () => undefined});')
-    return browser, page
-
-
-def main():
-    papers = load_papers()
-
-    # Find papers with S2 ID but no abstract
-    candidates = [(i, p) for i, p in enumerate(papers) if p.get("s2_id") and not p.get("abstract")]
-    print(f"Papers with S2 ID but no abstract: {len(candidates)}")
+    page = await context.new_page()
+    await page.add_init_script('Object.defineProperty(navigator, "webdriver", {get: () => undefined});')
+    return context, page
 
-    found = 0
 
-    with sync_playwright() as pw:
-        browser, page = new_browser_page(pw)
-        session_count = 0
+async def worker(browser, jobs, papers: list[dict], progress: dict, total: int):
+    """Scrape candidates from the shared job iterator with one context of our own."""
+    context, page = await new_browser_page(browser)
+    session_count = 0
+    # Plain GETs for the server-rendered page; only this worker's thread uses it
+    http = requests.Session()
+    http.headers["User-Agent"] = USER_AGENT
 
-        for idx, (paper_idx, paper) in enumerate(candidates):
-            # Rotate browser session every BATCH_SIZE requests
+    try:
+        for idx, (paper_idx, paper) in jobs:
             if session_count >= BATCH_SIZE:
-                browser.close()
-                print(f"  --- Rotating browser session (30s cooldown) ---", flush=True)
-                time.sleep(30)
-                browser, page = new_browser_page(pw)
+                await context.close()
+                print(f"  --- Rotating browser session ({ROTATE_COOLDOWN}s cooldown) ---", flush=True)
+                await asyncio.sleep(ROTATE_COOLDOWN)
+                context, page = await new_browser_page(browser)
                 session_count = 0
 
             s2_id = paper["s2_id"]
             title = paper.get("title", "Unknown")[:60]
-            print(f"[{idx+1}/{len(candidates)}] {title}...", flush=True)
+            print(f"[{idx+1}/{total}] {title}...", flush=True)
 
-            abstract = fetch_abstract_from_s2(page, s2_id, verbose=True)
+            status, abstract = await asyncio.to_thread(fetch_abstract_from_html, http, s2_id)
+            if abstract:
+                print(f"    Found in server-rendered page", flush=True)
+            elif status == 404:
+                print(f"    Paper page not found", flush=True)
+                append_keys([s2_id], NOT_FOUND_FILE)
+            else:
+                # Fall back to rendering the page in the browser
+                abstract = await fetch_abstract_from_s2(page, s2_id, verbose=True)
+                session_count += 1
             if abstract:
                 papers[paper_idx]["abstract"] = abstract
                 papers[paper_idx]["abstract_source"] = "semantic_scholar_web"
-                found += 1
+                append_abstract(papers[paper_idx])
+                progress["found"] += 1
                 print(f"  -> FOUND abstract ({len(abstract)} chars)", flush=True)
             else:
                 print(f"  -> No abstract found", flush=True)
 
-            session_count += 1
+            progress["done"] += 1
 
-            if idx % 5 == 0 and idx > 0:
-                print(f"  === Checkpoint: {idx}/{len(candidates)} (found: {found}) ===", flush=True)
-                save_papers(papers)
+            if progress["done"] % PROGRESS_EVERY == 0:
+                print(f"  === Progress: {progress['done']}/{total} (found: {progress['found']}) ===", flush=True)
 
             # Delay between requests
-            time.sleep(5)
+            await asyncio.sleep(REQUEST_DELAY)
+    finally:
+        http.close()
+        await context.close()
+
+
+async def scrape(papers: list[dict], candidates: list[tuple[int, dict]]) -> int:
+    """Run WORKERS scrapers over the candidates; returns the number of abstracts found."""
+    progress = {"done": 0, "found": 0}
+    # Workers pull from one iterator, so each candidate is visited exactly once
+    jobs = enumerate(candidates)
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=True,
+            args=["--disable-blink-features=AutomationControlled"],
+        )
+        try:
+            await asyncio.gather(*(
+                worker(browser, jobs, papers, progress, len(candidates))
+                for _ in range(min(WORKERS, len(candidates)))
+            ))
+        finally:
+            await browser.close()
+
+    return progress["found"]
+
+
+def main():
+    papers = load_papers()
+    replayed = replay_abstracts(papers)
+    if replayed:
+        print(f"Recovered {replayed} abstracts from an interrupted run")
+
+    # Find papers with S2 ID but no abstract
+    not_found = load_key_set(NOT_FOUND_FILE)
+    candidates = [
+        (i, p) for i, p in iter_missing_abstract(papers, require_key="s2_id")
+        if p["s2_id"] not in not_found
+    ]
+    print(f"Papers with S2 ID but no abstract: {len(candidates)} (skipping {len(not_found)} known 404s)")
 
-        browser.close()
+    found = asyncio.run(scrape(papers, candidates))
 
-    # Final save
-    save_papers(papers)
+    # Final save; found abstracts were already appended to the delta file as they arrived
+    compact_abstracts(papers)
 
     print(f"\nFetched {found} abstracts from Semantic Scholar")
 
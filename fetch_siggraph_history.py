@@ -4,6 +4,7 @@ Fetch abstracts from SIGGRAPH History Archive for older papers.
 https://history.siggraph.org/
 """
 
+import bisect
 import json
 import re
 import time
@@ -11,27 +12,91 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from paper_io import load_papers, save_papers, iter_missing_abstract, DATA_FILE
 
 DATA_DIR = Path(__file__).parent / "data"
-INPUT_FILE = DATA_DIR / "papers.json"
+INPUT_FILE = DATA_FILE
 OUTPUT_FILE = INPUT_FILE
 
 SITEMAP_BASE = "https://history.siggraph.org/wp-sitemap-posts-learning-{}.xml"
+# Sitemaps are kept here with their ETag/Last-Modified for conditional GETs
+SITEMAP_CACHE_DIR = DATA_DIR / "sitemaps"
+# The parsed title -> URL map; reused without touching the network while fresh
+URL_MAP_CACHE = SITEMAP_CACHE_DIR / "url_map.json"
+URL_MAP_TTL = 24 * 3600  # seconds
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 
+PUNCT_RE = re.compile(r"[^\w\s]")
+WHITESPACE_RE = re.compile(r"\s+")
+SLUG_INVALID_RE = re.compile(r"[^\w-]")
+LEARNING_SLUG_RE = re.compile(r"/learning/(.+?)(?:-by-|-chaired-by-|/$)")
+# The abstract is typically in one of the first <p> tags in the content
+FIRST_PARAGRAPHS = etree.XPath("(//p)[position() <= 3]")
+
+# Every request goes to history.siggraph.org, so one keep-alive session serves them all
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+    ),
+)
+
 
 def normalize_title(title: str) -> str:
     """Normalize title for matching."""
     # Remove punctuation, lowercase, normalize whitespace
     title = title.lower()
-    title = re.sub(r"[^\w\s]", " ", title)
-    title = re.sub(r"\s+", " ", title).strip()
+    title = PUNCT_RE.sub(" ", title)
+    title = WHITESPACE_RE.sub(" ", title).strip()
     return title
 
 
+def fetch_sitemap(url: str) -> str | None:
+    """GET a sitemap, revalidating the cached copy so an unchanged one isn't re-downloaded."""
+    name = url.rsplit("/", 1)[1]
+    body_path = SITEMAP_CACHE_DIR / name
+    meta_path = SITEMAP_CACHE_DIR / f"{name}.meta"
+
+    headers = {}
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = SESSION.get(url, headers=headers, timeout=15)
+    if resp.status_code == 304:
+        return body_path.read_text(encoding="utf-8")
+    if resp.status_code != 200:
+        return None
+
+    SITEMAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    body_path.write_text(resp.text, encoding="utf-8")
+    meta = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    return resp.text
+
+
 def fetch_all_history_urls() -> dict[str, str]:
     """Fetch all URLs from SIGGRAPH History sitemap and index by normalized title."""
+    try:
+        if time.time() - URL_MAP_CACHE.stat().st_mtime < URL_MAP_TTL:
+            with open(URL_MAP_CACHE, "r", encoding="utf-8") as f:
+                url_map = json.load(f)
+            print(f"Loaded {len(url_map)} SIGGRAPH History pages from {URL_MAP_CACHE.name}")
+            return url_map
+    except (OSError, ValueError):
+        pass
+
     print("Fetching SIGGRAPH History sitemap...")
     ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
 
@@ -39,13 +104,13 @@ def fetch_all_history_urls() -> dict[str, str]:
     for i in range(1, 9):
         url = SITEMAP_BASE.format(i)
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            if resp.status_code == 200:
-                root = ET.fromstring(resp.text)
+            text = fetch_sitemap(url)
+            if text is not None:
+                root = ET.fromstring(text)
                 for loc in root.findall(".//sm:loc", ns):
                     page_url = loc.text
                     # Extract title from URL slug
-                    match = re.search(r"/learning/(.+?)(?:-by-|-chaired-by-|/$)", page_url)
+                    match = LEARNING_SLUG_RE.search(page_url)
                     if match:
                         slug = match.group(1).replace("-", " ")
                         normalized = normalize_title(slug)
@@ -55,20 +120,22 @@ def fetch_all_history_urls() -> dict[str, str]:
         time.sleep(0.2)
 
     print(f"  Found {len(url_map)} pages")
+    if url_map:
+        SITEMAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(URL_MAP_CACHE, "w", encoding="utf-8") as f:
+            json.dump(url_map, f, ensure_ascii=False)
     return url_map
 
 
 def fetch_abstract_from_page(url: str) -> str | None:
     """Fetch and extract abstract from a SIGGRAPH History page."""
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # The abstract is typically in the first <p> tag in the content
-            paragraphs = soup.find_all("p")
-            for p in paragraphs[:3]:
-                text = p.get_text(strip=True)
+        resp = SESSION.get(url, timeout=10)
+        if resp.status_code == 200 and resp.content:
+            # Bytes let lxml pick up the page's declared encoding
+            tree = html.fromstring(resp.content)
+            for p in FIRST_PARAGRAPHS(tree):
+                text = WHITESPACE_RE.sub(" ", p.text_content()).strip()
                 # Skip if too short or looks like metadata
                 if len(text) > 100 and not text.startswith("1.") and "copyright" not in text.lower():
                     return text
@@ -91,8 +158,8 @@ def generate_url_from_paper(paper: dict) -> str | None:
 
     # Slugify title
     title_slug = title.lower()
-    title_slug = re.sub(r"[^\w\s]", "", title_slug)
-    title_slug = re.sub(r"\s+", "-", title_slug).strip("-")
+    title_slug = PUNCT_RE.sub("", title_slug)
+    title_slug = WHITESPACE_RE.sub("-", title_slug).strip("-")
 
     # Get last names of first two authors
     def get_last_name(name):
@@ -106,13 +173,16 @@ def generate_url_from_paper(paper: dict) -> str | None:
     else:
         author_slug = f"{get_last_name(authors[0])}-et-al"
 
-    author_slug = re.sub(r"[^\w-]", "", author_slug)
+    author_slug = SLUG_INVALID_RE.sub("", author_slug)
 
     return f"https://history.siggraph.org/learning/{title_slug}-by-{author_slug}/"
 
 
-def match_paper_to_url(paper: dict, url_map: dict[str, str]) -> str | None:
-    """Try to match a paper to a SIGGRAPH History URL."""
+def match_paper_to_url(paper: dict, url_map: dict[str, str], sorted_slugs: list[str]) -> str | None:
+    """Try to match a paper to a SIGGRAPH History URL.
+
+    sorted_slugs is sorted(url_map), built once by the caller for prefix lookups.
+    """
     title = paper.get("title", "")
     if not title:
         return None
@@ -130,10 +200,16 @@ def match_paper_to_url(paper: dict, url_map: dict[str, str]) -> str | None:
         return url_map[normalized]
 
     # Try partial match (title might be truncated in URL)
-    for slug, url in url_map.items():
-        if normalized.startswith(slug) or slug.startswith(normalized):
-            if len(slug) > 20 and len(normalized) > 20:
+    if len(normalized) > 20:
+        # A slug that is a prefix of the title: look up each prefix, longest first
+        for end in range(len(normalized) - 1, 20, -1):
+            url = url_map.get(normalized[:end])
+            if url:
                 return url
+        # A slug that extends the title sorts right after it
+        i = bisect.bisect_left(sorted_slugs, normalized)
+        if i < len(sorted_slugs) and sorted_slugs[i].startswith(normalized):
+            return url_map[sorted_slugs[i]]
 
     # Try generating URL from metadata
     generated = generate_url_from_paper(paper)
@@ -141,20 +217,20 @@ def match_paper_to_url(paper: dict, url_map: dict[str, str]) -> str | None:
 
 
 def main():
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        papers = json.load(f)
+    papers = load_papers()
 
     # Find papers missing abstracts (focus on older ones)
-    missing = [(i, p) for i, p in enumerate(papers) if not p.get("abstract")]
+    missing = list(iter_missing_abstract(papers))
     print(f"Papers missing abstracts: {len(missing)}")
 
     # Fetch URL map
     url_map = fetch_all_history_urls()
+    sorted_slugs = sorted(url_map)
 
     # Try to match and fetch
     found = 0
     for idx, (paper_idx, paper) in enumerate(missing):
-        url = match_paper_to_url(paper, url_map)
+        url = match_paper_to_url(paper, url_map, sorted_slugs)
         if url:
             abstract = fetch_abstract_from_page(url)
             if abstract:
@@ -172,8 +248,7 @@ def main():
     print(f"\nFetched {found} abstracts from SIGGRAPH History")
 
     # Save
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(papers, f, indent=2, ensure_ascii=False)
+    save_papers(papers)
 
     with_abstract = sum(1 for p in papers if p.get("abstract"))
     print(f"Papers with abstracts: {with_abstract}/{len(papers)} ({100 * with_abstract / len(papers):.1f}%)")
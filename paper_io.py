@@ -1,7 +1,11 @@
-"""Shared read/write helpers with file locking for papers.json."""
+"""Shared read/write helpers for papers.json.
+
+Writes go to a temp file that is swapped in with os.replace, so readers see
+either the old or the new file, never a partial one.
+"""
 
 import json
-import msvcrt
+import os
 import time
 from pathlib import Path
 
@@ -12,17 +16,11 @@ RETRY_DELAY = 0.5  # seconds
 
 
 def load_papers(path=DATA_FILE):
-    """Load papers with file locking and retry."""
+    """Load papers, retrying while the file is briefly unavailable."""
     for attempt in range(MAX_RETRIES):
         try:
             with open(path, "r", encoding="utf-8") as f:
-                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
-                try:
-                    data = json.load(f)
-                finally:
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
-                return data
+                return json.load(f)
         except (OSError, PermissionError) as e:
             if attempt < MAX_RETRIES - 1:
                 time.sleep(RETRY_DELAY)
@@ -31,19 +29,100 @@ def load_papers(path=DATA_FILE):
 
 
 def save_papers(papers, path=DATA_FILE):
-    """Save papers with file locking and retry."""
+    """Save papers atomically, retrying if the target is briefly held open (Windows)."""
+    path = Path(path)
+    tmp = path.with_suffix(".json.tmp")
+    # One dumps() + write() instead of json.dump's many small writes
+    data = json.dumps(papers, ensure_ascii=False)
     for attempt in range(MAX_RETRIES):
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
-                try:
-                    json.dump(papers, f, ensure_ascii=False)
-                finally:
-                    f.seek(0)
-                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
-                return
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            return
         except (OSError, PermissionError) as e:
             if attempt < MAX_RETRIES - 1:
                 time.sleep(RETRY_DELAY)
             else:
                 raise RuntimeError(f"Failed to write {path} after {MAX_RETRIES} attempts: {e}")
+
+
+def iter_missing_abstract(papers, *, require_key=None):
+    """Yield (index, paper) for papers without an abstract (and with require_key set, if given)."""
+    return (
+        (i, p) for i, p in enumerate(papers)
+        if not p.get("abstract") and (require_key is None or p.get(require_key))
+    )
+
+
+def index_by(papers, key):
+    """Map each non-empty value of key to its paper's index in papers."""
+    return {p[key]: i for i, p in enumerate(papers) if p.get(key)}
+
+
+# Abstracts found by the fetch scripts are appended here one JSON line at a
+# time, so checkpoints don't rewrite all of papers.json
+DELTA_FILE = DATA_FILE.with_name("abstracts_delta.jsonl")
+
+
+def append_abstract(paper, path=DELTA_FILE):
+    """Record a paper's newly fetched abstract in the delta file."""
+    entry = {
+        "dblp_key": paper.get("dblp_key"),
+        "abstract": paper["abstract"],
+        "abstract_source": paper.get("abstract_source"),
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def replay_abstracts(papers, path=DELTA_FILE):
+    """Apply abstracts left in the delta file by an interrupted run. Returns the count applied."""
+    if not Path(path).exists():
+        return 0
+    by_key = index_by(papers, "dblp_key")
+    applied = 0
+    line = "\n"
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from a crash
+            idx = by_key.get(entry.get("dblp_key"))
+            if idx is None:
+                continue
+            paper = papers[idx]
+            if not paper.get("abstract"):
+                paper["abstract"] = entry["abstract"]
+                paper["abstract_source"] = entry["abstract_source"]
+                applied += 1
+    if not line.endswith("\n"):
+        # Terminate a torn line so the next append starts on a fresh one
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n")
+    return applied
+
+
+def compact_abstracts(papers, path=DATA_FILE, delta_path=DELTA_FILE):
+    """Save the full papers list once and drop the delta file it now includes."""
+    save_papers(papers, path)
+    Path(delta_path).unlink(missing_ok=True)
+
+
+def load_key_set(path):
+    """Read a one-key-per-line file (e.g. lookups known to 404) into a set."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def append_keys(keys, path):
+    """Append keys to a one-key-per-line file."""
+    if keys:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in keys)
@@ -2,7 +2,12 @@
 Paper Recommender System using embedding-based similarity.
 """
 
+import atexit
 import json
+import os
+import queue
+import threading
+import time
 import numpy as np
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
@@ -18,24 +23,92 @@ READLIST_FILE = DATA_DIR / "readlist.json"
 MODEL_NAME = "allenai/specter2_base"
 
 
+def _row_norms(x: np.ndarray) -> np.ndarray:
+    """L2 norm of each row; einsum skips np.linalg.norm's dispatch and temporaries."""
+    return np.sqrt(np.einsum("ij,ij->i", x, x))
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix."""
+    norms = _row_norms(x)[:, None]
+    norms = np.maximum(norms, 1e-10)  # avoid division by zero
+    return x / norms
+
+
+def _write_json(path: Path, data):
+    """Write JSON via a temp file so a crash mid-write never truncates the original."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        # Saves run on the writer thread, so syncing costs no request time
+        # and a power loss can't leave an empty file behind the rename
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 class PaperRecommender:
     def __init__(self):
         self.papers: list[dict] = []
+        self._by_key: dict[str, dict] = {}  # dblp_key -> paper
+        self._key_to_idx: dict[str, int] = {}  # dblp_key -> row in papers/embeddings
+        self.years: np.ndarray = np.zeros(0, dtype=np.int32)  # year per paper row
+        # Lowercased "title\tauthors" of every paper joined by newlines, and the
+        # offset where each paper's line starts (see find_paper)
+        self._search_blob = ""
+        self._search_starts: np.ndarray = np.zeros(0, dtype=np.int64)
         self.embeddings: np.ndarray | None = None
+        # (embeddings array, its row-normalized copy); see _normalized_embeddings
+        self._normalized: tuple[np.ndarray | None, np.ndarray | None] = (None, None)
         self.ratings: dict[str, float] = {}  # dblp_key -> score (-1 for irrelevant, 1-5 for rated)
         self.readlist: dict[str, int] = {}  # dblp_key -> priority (0-5, 0=default)
         self.model: SentenceTransformer | None = None
+        self.positive_count = 0  # number of ratings > 0, kept in sync with self.ratings
+        self.negative_count = 0  # number of ratings < 0
+        # Bumped on every rating/readlist mutation so clients can ask for deltas
+        self.state_version = 0
+        self._ratings_changed: dict[str, int] = {}  # dblp_key -> version of last change
+        self._ratings_version = 0  # state_version of the last rating change
+        # (ratings version, embeddings array, scores for every paper); see _compute_similarities
+        self._sim_cache: tuple[int, np.ndarray, np.ndarray] | None = None
+        self._readlist_changed: dict[str, int] = {}
+        # Background writer for ratings/readlist saves (see start_writer)
+        self._write_queue: queue.Queue | None = None
+        self._save_lock = threading.Lock()
 
     def load_papers(self, path: Path = PAPERS_FILE):
         """Load papers from JSON file."""
         with open(path, "r", encoding="utf-8") as f:
             self.papers = json.load(f)
+        self._by_key = {p["dblp_key"]: p for p in self.papers}
+        self._key_to_idx = {p["dblp_key"]: i for i, p in enumerate(self.papers)}
+        self.years = np.array([p.get("year") or 0 for p in self.papers], dtype=np.int32)
+        self._build_search_index()
         print(f"Loaded {len(self.papers)} papers")
 
+    def _build_search_index(self):
+        """Build the lowercased text buffer scanned by find_paper."""
+        lines = []
+        for p in self.papers:
+            title = p.get("title") or ""
+            authors = " ".join(p.get("authors") or [])
+            line = f"{title}\t{authors}".replace("\n", " ").lower()
+            lines.append(line)
+        lengths = np.fromiter((len(line) + 1 for line in lines), dtype=np.int64, count=len(lines))
+        self._search_starts = np.cumsum(lengths) - lengths
+        self._search_blob = "\n".join(lines)
+
     def load_embeddings(self, path: Path = EMBEDDINGS_FILE):
         """Load pre-computed embeddings."""
         if path.exists():
-            self.embeddings = np.load(path)
+            # Memory-map rather than read the file: pages load on first use,
+            # and scoring only a few rows touches only those rows.  float32
+            # and C-contiguous so the similarity matmuls hit BLAS directly
+            # (and release the GIL); that is a no-copy view for the float32
+            # files build_embeddings.py writes.
+            self.embeddings = np.ascontiguousarray(
+                np.load(path, mmap_mode="r"), dtype=np.float32
+            )
             print(f"Loaded embeddings: {self.embeddings.shape}")
         else:
             print("No embeddings found. Run compute_embeddings() first.")
@@ -46,11 +119,15 @@ class PaperRecommender:
             with open(path, "r", encoding="utf-8") as f:
                 self.ratings = json.load(f)
             print(f"Loaded {len(self.ratings)} ratings")
+        self.positive_count = sum(1 for v in self.ratings.values() if v > 0)
+        self.negative_count = sum(1 for v in self.ratings.values() if v < 0)
 
     def save_ratings(self, path: Path = RATINGS_FILE):
         """Save user ratings."""
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.ratings, f, indent=2)
+        with self._save_lock:
+            # dict() snapshots atomically, so the writer thread never sees
+            # the dict change size mid-dump
+            _write_json(path, dict(self.ratings))
 
     def load_readlist(self, path: Path = READLIST_FILE):
         """Load reading list. Auto-migrates old list format to dict with ranks."""
@@ -68,37 +145,104 @@ class PaperRecommender:
 
     def save_readlist(self, path: Path = READLIST_FILE):
         """Save reading list."""
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.readlist, f, indent=2)
+        with self._save_lock:
+            _write_json(path, dict(self.readlist))
+
+    # Seconds without new mutations before the writer thread saves a burst,
+    # and the longest a burst may keep postponing its save
+    WRITE_BEHIND_DELAY = 0.2
+    WRITE_BEHIND_MAX = 1.5
+
+    def start_writer(self):
+        """
+        Persist ratings/readlist from a background thread. Mutations then only
+        queue a save, and a burst of them is coalesced into one write per file.
+        """
+        if self._write_queue is not None:
+            return
+        self._write_queue = queue.Queue()
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        atexit.register(self.flush)
+
+    def flush(self):
+        """Write everything the background writer may still be holding."""
+        if self._write_queue is None:
+            return
+        # The writer may have already dequeued a save it has not written yet,
+        # so write both files rather than only what is left in the queue.
+        self._write({"ratings", "readlist"})
+
+    def _writer_loop(self):
+        while True:
+            pending = {self._write_queue.get()}
+            deadline = time.monotonic() + self.WRITE_BEHIND_MAX
+            while True:
+                # Steady clicking keeps resetting the quiet period; the deadline
+                # bounds how much a crash could lose
+                timeout = min(self.WRITE_BEHIND_DELAY, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    pending.add(self._write_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(pending)
+
+    def _write(self, names: set[str]):
+        if "ratings" in names:
+            self.save_ratings()
+        if "readlist" in names:
+            self.save_readlist()
+
+    def _persist(self, name: str):
+        """Save "ratings" or "readlist", deferring to the writer thread if running."""
+        if self._write_queue is not None:
+            self._write_queue.put(name)
+        else:
+            self._write({name})
 
     def add_to_readlist(self, dblp_key: str):
         """Add a paper to the bottom of the reading list."""
         max_rank = max(self.readlist.values()) if self.readlist else 0
         self.readlist[dblp_key] = max_rank + 1
-        self.save_readlist()
+        self._touch(self._readlist_changed, dblp_key)
+        self._persist("readlist")
 
     def remove_from_readlist(self, dblp_key: str):
         """Remove a paper from reading list."""
         self.readlist.pop(dblp_key, None)
-        self.save_readlist()
+        self._touch(self._readlist_changed, dblp_key)
+        self._persist("readlist")
 
     def move_readlist_up(self, dblp_key: str):
         """Decrease a paper's rank value by 1 (moves it higher)."""
         if dblp_key in self.readlist:
             self.readlist[dblp_key] -= 1
-            self.save_readlist()
+            self._touch(self._readlist_changed, dblp_key)
+            self._persist("readlist")
 
     def move_readlist_down(self, dblp_key: str):
         """Increase a paper's rank value by 1 (moves it lower)."""
         if dblp_key in self.readlist:
             self.readlist[dblp_key] += 1
-            self.save_readlist()
+            self._touch(self._readlist_changed, dblp_key)
+            self._persist("readlist")
+
+    def set_readlist_rank(self, dblp_key: str, rank: int):
+        """Set a paper's rank value directly (ignored if not in the readlist)."""
+        if dblp_key in self.readlist:
+            self.readlist[dblp_key] = rank
+            self._touch(self._readlist_changed, dblp_key)
+            self._persist("readlist")
 
     def _get_model(self) -> SentenceTransformer:
         """Lazy load the embedding model."""
         if self.model is None:
             print(f"Loading model {MODEL_NAME}...")
-            self.model = SentenceTransformer(MODEL_NAME)
+            self.model = SentenceTransformer(MODEL_NAME)  # picks CUDA automatically when available
+            if self.model.device.type == "cuda":
+                # Half precision runs on tensor cores, and the freed memory allows larger batches
+                self.model.half()
         return self.model
 
     def _paper_text(self, paper: dict) -> str:
@@ -109,18 +253,24 @@ class PaperRecommender:
             return f"{title} {abstract}"
         return title
 
-    def compute_embeddings(self, batch_size: int = 32):
-        """Compute embeddings for all papers."""
+    def compute_embeddings(self, batch_size: int | None = None):
+        """Compute embeddings for all papers (batch_size defaults to 256 on GPU, 32 on CPU)."""
         model = self._get_model()
+        if batch_size is None:
+            batch_size = 256 if model.device.type == "cuda" else 32
         texts = [self._paper_text(p) for p in self.papers]
 
-        print(f"Computing embeddings for {len(texts)} papers...")
+        print(f"Computing embeddings for {len(texts)} papers on {model.device}...")
         self.embeddings = model.encode(
             texts,
             batch_size=batch_size,
             show_progress_bar=True,
             convert_to_numpy=True,
+            normalize_embeddings=True,
         )
+        # Stored as contiguous float32 (even if encoded in half precision) so
+        # load_embeddings can map it without a copy
+        self.embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
 
         np.save(EMBEDDINGS_FILE, self.embeddings)
         print(f"Saved embeddings to {EMBEDDINGS_FILE}")
@@ -130,29 +280,93 @@ class PaperRecommender:
         Rate a paper.
         score: -1 for irrelevant, 1-5 for interest level
         """
+        self._set_rating(dblp_key, score)
+        self._persist("ratings")
+
+    def clear_rating(self, dblp_key: str):
+        """Remove a paper's rating."""
+        self._remove_rating(dblp_key)
+        self._persist("ratings")
+
+    def rate_papers(self, updates: dict[str, float]):
+        """
+        Apply several ratings at once, saving only once.
+        A score of 0 removes the rating.
+        """
+        for dblp_key, score in updates.items():
+            if score == 0:
+                self._remove_rating(dblp_key)
+            else:
+                self._set_rating(dblp_key, score)
+        self._persist("ratings")
+
+    def _set_rating(self, dblp_key: str, score: float):
+        self._count_rating(self.ratings.get(dblp_key), -1)
         self.ratings[dblp_key] = score
-        self.save_ratings()
+        self._count_rating(score, 1)
+        self._touch(self._ratings_changed, dblp_key)
+        self._ratings_version = self.state_version
+
+    def _remove_rating(self, dblp_key: str):
+        self._count_rating(self.ratings.pop(dblp_key, None), -1)
+        self._touch(self._ratings_changed, dblp_key)
+        self._ratings_version = self.state_version
+
+    def _touch(self, changed: dict[str, int], dblp_key: str):
+        """Record that a key changed, bumping the state version."""
+        self.state_version += 1
+        changed[dblp_key] = self.state_version
+
+    def changes_since(self, version: int) -> tuple[dict, dict]:
+        """
+        Get ratings and readlist entries changed after the given version.
+        Returns (ratings, readlist) dicts; removed keys map to None.
+        """
+        # list(): request threads may record changes while this runs
+        ratings = {k: self.ratings.get(k) for k, v in list(self._ratings_changed.items()) if v > version}
+        readlist = {k: self.readlist.get(k) for k, v in list(self._readlist_changed.items()) if v > version}
+        return ratings, readlist
+
+    def _count_rating(self, score: float | None, delta: int):
+        """Adjust the positive/negative counters for a score entering or leaving."""
+        if score is None:
+            return
+        if score > 0:
+            self.positive_count += delta
+        elif score < 0:
+            self.negative_count += delta
 
     # Number of nearest rated papers to average for scoring
     TOPK_NEIGHBORS = 5
 
-    def _compute_similarities(self):
+    def _compute_similarities(self, rows: np.ndarray | None = None):
         """
         Compute per-paper similarity scores using top-k average similarity.
         For each candidate paper, find its top-k most similar positively rated
         papers and average those similarities (weighted by rating).
-        Returns (similarities array, key_to_idx dict) or (None, None).
+        rows: indices of the papers to score; defaults to all papers.
+        Returns (similarities array aligned with rows, key_to_idx dict) or (None, None).
+        Scores for all papers are cached until the ratings or embeddings change,
+        and later calls (including row subsets) are served from that cache.
         """
         if not self.ratings or self.embeddings is None:
             return None, None
 
-        key_to_idx = {p["dblp_key"]: i for i, p in enumerate(self.papers)}
+        key_to_idx = self._key_to_idx
+        # Read before the ratings snapshot below, so a rating that lands
+        # mid-computation leaves the cached entry already out of date
+        version = self._ratings_version
+        cached = self._sim_cache
+        if cached is not None and cached[0] == version and cached[1] is self.embeddings:
+            return (cached[2] if rows is None else cached[2][rows]), key_to_idx
 
         positive_indices = []
         positive_weights = []
         negative_indices = []
 
-        for key, score in self.ratings.items():
+        # Snapshot: under a threaded server another request may rate a
+        # paper while this (GIL-releasing) computation is running
+        for key, score in list(self.ratings.items()):
             if key not in key_to_idx:
                 continue
             idx = key_to_idx[key]
@@ -165,49 +379,77 @@ class PaperRecommender:
         if not positive_indices:
             return None, None
 
-        # Normalize all embeddings
-        norms = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
-        norms = np.maximum(norms, 1e-10)  # avoid division by zero
-        embeddings_norm = self.embeddings / norms
+        normalized = self._normalized_embeddings()
+        embeddings_norm = normalized if rows is None else normalized[rows]
 
-        # Compute similarity of every paper to every positively rated paper
-        pos_embeddings = embeddings_norm[positive_indices]  # (n_pos, dim)
-        pos_weights = np.array(positive_weights)  # (n_pos,)
-        sim_matrix = embeddings_norm @ pos_embeddings.T  # (n_papers, n_pos)
+        pos_embeddings = normalized[positive_indices]  # (n_pos, dim)
+        # float32 like the embeddings, so the products below don't upcast
+        # (and copy) the whole candidate matrix to float64
+        pos_weights = np.array(positive_weights, dtype=np.float32)  # (n_pos,)
 
         # For each paper, take weighted average of top-k most similar rated papers
         k = min(self.TOPK_NEIGHBORS, len(positive_indices))
         if k == len(positive_indices):
-            # Use all rated papers, weighted average
-            weighted = sim_matrix * pos_weights[np.newaxis, :]
-            similarities = weighted.sum(axis=1) / pos_weights.sum()
+            # Use all rated papers, weighted average.  That is linear in the
+            # similarities, so fold the weights into one "taste" vector.
+            pos_queries = (pos_weights @ pos_embeddings / pos_weights.sum())[None]  # (1, dim)
         else:
-            # For each paper, find the top-k most similar rated papers
-            top_k_indices = np.argpartition(sim_matrix, -k, axis=1)[:, -k:]
-            similarities = np.zeros(len(self.papers))
-            for i in range(len(self.papers)):
-                top_idx = top_k_indices[i]
-                top_sims = sim_matrix[i, top_idx]
-                top_w = pos_weights[top_idx]
-                similarities[i] = np.average(top_sims, weights=top_w)
-
-        # Penalize papers similar to negatively rated ones using top-k negatives
+            pos_queries = pos_embeddings
+
+        # Penalize papers similar to negatively rated ones using top-k negatives;
+        # a mean over all of them is again a single query vector
+        k_neg = min(self.TOPK_NEIGHBORS, len(negative_indices))
+        if not negative_indices:
+            neg_queries = normalized[:0]  # (0, dim)
+        elif k_neg == len(negative_indices):
+            neg_queries = normalized[negative_indices].mean(axis=0, keepdims=True)
+        else:
+            neg_queries = normalized[negative_indices]
+
+        # One product against positives and negatives together, so the
+        # candidate rows are streamed from memory once per request
+        sims = embeddings_norm @ np.concatenate([pos_queries, neg_queries]).T
+        pos_sims, neg_sims = sims[:, :len(pos_queries)], sims[:, len(pos_queries):]
+
+        if k == len(positive_indices):
+            similarities = pos_sims[:, 0]
+        else:
+            # For each paper, find the top-k most similar rated papers and
+            # take their weighted average for all rows at once
+            top_k_indices = np.argpartition(pos_sims, -k, axis=1)[:, -k:]
+            top_sims = np.take_along_axis(pos_sims, top_k_indices, axis=1)
+            top_w = pos_weights[top_k_indices]  # (n_candidates, k)
+            similarities = (top_sims * top_w).sum(axis=1) / top_w.sum(axis=1)
+
         if negative_indices:
-            neg_embeddings = embeddings_norm[negative_indices]
-            neg_sims = embeddings_norm @ neg_embeddings.T  # (n_papers, n_neg)
-            k_neg = min(self.TOPK_NEIGHBORS, len(negative_indices))
             if k_neg == len(negative_indices):
-                neg_penalty = neg_sims.mean(axis=1)
+                neg_penalty = neg_sims[:, 0]
             else:
                 top_neg_indices = np.argpartition(neg_sims, -k_neg, axis=1)[:, -k_neg:]
-                neg_penalty = np.array([
-                    neg_sims[i, top_neg_indices[i]].mean()
-                    for i in range(len(self.papers))
-                ])
+                neg_penalty = np.take_along_axis(neg_sims, top_neg_indices, axis=1).mean(axis=1)
             similarities = similarities - 0.5 * neg_penalty
 
+        if rows is None:
+            similarities.flags.writeable = False  # shared by later callers
+            self._sim_cache = (version, self.embeddings, similarities)
         return similarities, key_to_idx
 
+    def _normalized_embeddings(self) -> np.ndarray:
+        """
+        Row-normalized embeddings, so cosine similarity is a plain matmul.
+        Computed once per embeddings array rather than on every request.
+        """
+        source, normalized = self._normalized
+        if source is not self.embeddings:
+            norms = _row_norms(self.embeddings)
+            if np.allclose(norms, 1.0, atol=1e-4):
+                # Normalized at build time: use the (memory-mapped) array as is
+                normalized = self.embeddings
+            else:
+                normalized = _normalize(self.embeddings)
+            self._normalized = (self.embeddings, normalized)
+        return normalized
+
     def get_recommendations(self, top_k: int = 20) -> list[tuple[dict, float]]:
         """
         Get paper recommendations based on ratings.
@@ -217,57 +459,123 @@ class PaperRecommender:
         if similarities is None:
             return []
 
-        # Rank and filter out already-rated papers and papers in readlist
-        rated_indices = {key_to_idx[k] for k in self.ratings if k in key_to_idx}
-        readlist_indices = {key_to_idx[k] for k in self.readlist if k in key_to_idx}
-        exclude_indices = rated_indices | readlist_indices
-        ranked_indices = np.argsort(similarities)[::-1]
-
-        results = []
-        for idx in ranked_indices:
-            if idx in exclude_indices:
-                continue
-            results.append((self.papers[idx], float(similarities[idx])))
-            if len(results) >= top_k:
-                break
+        # Mask out already-rated papers and papers in readlist, then pull out
+        # the best top_k with argpartition instead of sorting every paper
+        excluded = np.zeros(len(similarities), dtype=bool)
+        excluded[[key_to_idx[k] for k in list(self.ratings) if k in key_to_idx]] = True
+        excluded[[key_to_idx[k] for k in list(self.readlist) if k in key_to_idx]] = True
+        candidates = np.flatnonzero(~excluded)
+        k = min(top_k, len(candidates))
+        if k <= 0:
+            return []
+        cand_scores = similarities[candidates]
+        top = np.argpartition(-cand_scores, k - 1)[:k]
+        top = top[np.argsort(-cand_scores[top], kind="stable")]
 
-        return results
+        return [(self.papers[i], float(s)) for i, s in zip(candidates[top], cand_scores[top])]
 
     def get_relevance_scores(self, keys: list[str]) -> dict[str, float]:
         """
         Compute relevance scores for specific papers.
         Returns dict mapping dblp_key -> relevance score.
         """
-        similarities, key_to_idx = self._compute_similarities()
+        if self.embeddings is None:
+            return {}
+        # Only score the requested papers rather than the whole corpus
+        key_to_idx = self._key_to_idx
+        found = [k for k in keys if k in key_to_idx]
+        rows = np.fromiter((key_to_idx[k] for k in found), dtype=np.int64, count=len(found))
+        similarities, _ = self._compute_similarities(rows)
         if similarities is None:
             return {}
 
-        scores = {}
-        for key in keys:
-            if key in key_to_idx:
-                idx = key_to_idx[key]
-                scores[key] = float(similarities[idx])
-
-        return scores
+        return dict(zip(found, similarities.tolist()))
 
     def find_paper(self, query: str) -> list[dict]:
         """Search for papers by title or author."""
         query_lower = query.lower()
+        if "\t" in query_lower or "\n" in query_lower:
+            return []  # would match across the title/author/paper separators
+        # Scan one contiguous buffer with str.find instead of testing each
+        # paper, mapping each hit back to its paper via the line offsets.
+        blob = self._search_blob
+        starts = self._search_starts
         matches = []
-        for p in self.papers:
-            title = p.get("title") or ""
-            authors = p.get("authors") or []
-            authors_str = " ".join(authors).lower()
-            if query_lower in title.lower() or query_lower in authors_str:
-                matches.append(p)
-        return matches[:50]
+        pos = blob.find(query_lower)
+        while pos != -1 and len(matches) < 50:
+            row = int(np.searchsorted(starts, pos, side="right")) - 1
+            matches.append(self.papers[row])
+            # Continue from the next paper so each paper is reported once
+            if row + 1 >= len(starts):
+                break
+            pos = blob.find(query_lower, int(starts[row + 1]))
+        return matches
 
     def get_paper_by_key(self, key: str) -> dict | None:
         """Get a paper by its DBLP key."""
-        for p in self.papers:
-            if p["dblp_key"] == key:
-                return p
-        return None
+        return self._by_key.get(key)
+
+    def get_papers_by_keys(self, keys: list[str]) -> list[dict | None]:
+        """Get papers for several DBLP keys (None for unknown keys)."""
+        by_key = self._by_key
+        return [by_key.get(k) for k in keys]
+
+    def get_years(self, keys: list[str]) -> np.ndarray:
+        """Get publication years for several DBLP keys (0 for unknown keys)."""
+        key_to_idx = self._key_to_idx
+        rows = np.fromiter((key_to_idx.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+        return np.where(rows >= 0, self.years[rows], 0)
+
+
+def _cmd_search(rec: PaperRecommender, arg: str):
+    if not arg:
+        print("Usage: search <query>")
+        return
+    lines = []
+    for p in rec.find_paper(arg):
+        score = rec.ratings.get(p["dblp_key"], "")
+        score_str = f" [rated: {score}]" if score else ""
+        lines.append(f"  {p['dblp_key']}: {p['title']} ({p['year']}){score_str}")
+    # One write for the whole result list rather than a print per line
+    if lines:
+        print("\n".join(lines))
+
+
+def _cmd_rate(rec: PaperRecommender, arg: str):
+    args = arg.split()
+    if len(args) >= 2:
+        key, score = args[0], float(args[1])
+        paper = rec.get_paper_by_key(key)
+        if paper:
+            rec.rate_paper(key, score)
+            print(f"Rated '{paper['title']}' as {score}")
+        else:
+            print(f"Paper not found: {key}")
+    else:
+        print("Usage: rate <dblp_key> <score>")
+
+
+def _cmd_rec(rec: PaperRecommender, arg: str):
+    n = int(arg) if arg else 10
+    lines = []
+    for i, (p, score) in enumerate(rec.get_recommendations(top_k=n), 1):
+        lines.append(f"{i:2}. [{score:.3f}] {p['title']} ({p['year']})")
+        lines.append(f"      Key: {p['dblp_key']}")
+    if lines:
+        print("\n".join(lines))
+
+
+def _cmd_embed(rec: PaperRecommender, arg: str):
+    rec.compute_embeddings()
+
+
+# CLI command name -> handler(rec, rest of the line)
+COMMANDS = {
+    "search": _cmd_search,
+    "rate": _cmd_rate,
+    "rec": _cmd_rec,
+    "embed": _cmd_embed,
+}
 
 
 def main():
@@ -276,6 +584,9 @@ def main():
     rec.load_papers()
     rec.load_embeddings()
     rec.load_ratings()
+    rec.load_readlist()
+    # Coalesce saves from a run of "rate" commands; flushed at exit
+    rec.start_writer()
 
     print("\nCommands:")
     print("  search <query>  - Search papers by title")
@@ -295,42 +606,16 @@ def main():
 
         parts = cmd.split(maxsplit=1)
         action = parts[0].lower()
+        arg = parts[1] if len(parts) > 1 else ""
 
         if action == "quit":
             break
 
-        elif action == "search" and len(parts) > 1:
-            matches = rec.find_paper(parts[1])
-            for p in matches:
-                score = rec.ratings.get(p["dblp_key"], "")
-                score_str = f" [rated: {score}]" if score else ""
-                print(f"  {p['dblp_key']}: {p['title']} ({p['year']}){score_str}")
-
-        elif action == "rate":
-            args = parts[1].split() if len(parts) > 1 else []
-            if len(args) >= 2:
-                key, score = args[0], float(args[1])
-                paper = rec.get_paper_by_key(key)
-                if paper:
-                    rec.rate_paper(key, score)
-                    print(f"Rated '{paper['title']}' as {score}")
-                else:
-                    print(f"Paper not found: {key}")
-            else:
-                print("Usage: rate <dblp_key> <score>")
-
-        elif action == "rec":
-            n = int(parts[1]) if len(parts) > 1 else 10
-            recs = rec.get_recommendations(top_k=n)
-            for i, (p, score) in enumerate(recs, 1):
-                print(f"{i:2}. [{score:.3f}] {p['title']} ({p['year']})")
-                print(f"      Key: {p['dblp_key']}")
-
-        elif action == "embed":
-            rec.compute_embeddings()
-
-        else:
+        handler = COMMANDS.get(action)
+        if handler is None:
             print("Unknown command. Type 'quit' to exit.")
+        else:
+            handler(rec, arg)
 
 
 if __name__ == "__main__":